@@ -9,23 +9,131 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from generators.ai_product_generator import AIProductGenerator
-from whop_api.whop_integration import WhopIntegration, BatchUploader
+from whop_api.whop_integration import WhopIntegration, BatchUploader, WhopWebhookHandler
 import time
-import schedule
-import json
+import asyncio
+import copy
+import orjson
 from datetime import datetime, timedelta
 from pathlib import Path
 import logging
+import sqlite3
+import numpy as np
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from urllib.parse import urlencode
+import threading
+import queue
+import functools
+
+# Seconds before analytics persisted to disk are considered stale
+ANALYTICS_DISK_TTL = 3600
+
+# Maximum analytics requests in flight at once
+ANALYTICS_CONCURRENCY = 20
+
+# Products streamed per batch from the WHOP catalog
+PRODUCT_BATCH_SIZE = 100
+
+# Seconds before the webhook-fed product index is rebuilt from the API anyway
+PRODUCT_INDEX_MAX_AGE = 24 * 3600
+
+# Rebuild interval when no webhook receiver runs, so price changes and deletions
+# made outside this process show up within the hour
+PRODUCT_INDEX_POLL_AGE = 3600
+
+# Catalog filter selecting the products this system created
+AUTO_GENERATED_FILTER = {'metadata.auto_generated': True}
+
+# High-converting product niches based on WHOP research
+PROFITABLE_NICHES: tuple = (
+    # Business & Entrepreneurship (Highest ROI)
+    ('Social Media Marketing Mastery', 'entrepreneurs', 'business'),
+    ('Dropshipping Empire Blueprint', 'ecommerce beginners', 'business'),
+    ('Real Estate Investment Guide', 'investors', 'finance'),
+    ('Affiliate Marketing Secrets', 'online marketers', 'business'),
+    ('Email Marketing Templates', 'business owners', 'marketing'),
+    
+    # Personal Development & Productivity
+    ('Ultimate Productivity Planner', 'professionals', 'productivity'),
+    ('Digital Detox Challenge', 'wellness seekers', 'wellness'),
+    ('Goal Setting Workbook', 'achievers', 'productivity'),
+    ('Time Management Mastery', 'busy professionals', 'productivity'),
+    ('Habit Tracker Templates', 'self-improvement', 'wellness'),
+    
+    # Health & Wellness
+    ('30-Day Fitness Planner', 'fitness enthusiasts', 'wellness'),
+    ('Meal Prep Made Simple', 'health conscious', 'wellness'),
+    ('Mental Health Journal', 'wellness seekers', 'wellness'),
+    ('Stress Management Guide', 'professionals', 'wellness'),
+    ('Sleep Optimization Blueprint', 'health optimizers', 'wellness'),
+    
+    # Finance & Investment
+    ('Personal Finance Tracker', 'young adults', 'finance'),
+    ('Cryptocurrency Basics', 'crypto beginners', 'finance'),
+    ('Retirement Planning Guide', 'adults 30+', 'finance'),
+    ('Side Hustle Starter Kit', 'income seekers', 'business'),
+    ('Budgeting Templates Bundle', 'savers', 'finance')
+)
+
+@functools.lru_cache(maxsize=4)
+def _read_config_cached(path: str, mtime: float) -> dict:
+    """Read the config file, re-parsing only when its modification time changes"""
+    default_config = {
+        'auto_generate': True,
+        'auto_upload': True,
+        'generation_interval_hours': 6,
+        'upload_interval_hours': 2,
+        'max_daily_products': 10,
+        'price_optimization': True,
+        'seo_optimization': True,
+        'webhook_notifications': True
+    }
+    
+    if mtime:
+        with open(path, 'rb') as f:
+            user_config = orjson.loads(f.read())
+            default_config.update(user_config)
+    
+    return default_config
+
+class TokenBucket:
+    """
+    Thread-safe token bucket that only blocks once the burst allowance is spent
+    """
+    
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate  # Tokens added per second
+        self.burst = burst
+        self.tokens = float(burst)
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Take one token, sleeping until one is available"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + self.rate * (now - self.last_refill))
+            self.last_refill = now
+            
+            if self.tokens < 1:
+                time.sleep((1 - self.tokens) / self.rate)
+                self.tokens = 1
+                self.last_refill = time.monotonic()
+            
+            self.tokens -= 1
 
 class AutoLauncher:
     def __init__(self):
         self.generator = AIProductGenerator()
-        self.whop = WhopIntegration()
+        self.product_index = WhopWebhookHandler()
+        self.whop = WhopIntegration(product_index=self.product_index)
         self.uploader = BatchUploader(self.whop)
         
-        # Setup logging
+        # Setup logging (DEBUG=true in .env enables debug output)
         logging.basicConfig(
-            level=logging.INFO,
+            level=logging.DEBUG if os.getenv('DEBUG', 'false').lower() == 'true' else logging.INFO,
             format='%(asctime)s - %(levelname)s - %(message)s',
             handlers=[
                 logging.FileHandler('logs/automation.log'),
@@ -37,36 +145,24 @@ class AutoLauncher:
         # Load configuration
         self.config = self._load_config()
         
-        # High-converting product niches based on WHOP research
-        self.profitable_niches = [
-            # Business & Entrepreneurship (Highest ROI)
-            ('Social Media Marketing Mastery', 'entrepreneurs', 'business'),
-            ('Dropshipping Empire Blueprint', 'ecommerce beginners', 'business'),
-            ('Real Estate Investment Guide', 'investors', 'finance'),
-            ('Affiliate Marketing Secrets', 'online marketers', 'business'),
-            ('Email Marketing Templates', 'business owners', 'marketing'),
-            
-            # Personal Development & Productivity
-            ('Ultimate Productivity Planner', 'professionals', 'productivity'),
-            ('Digital Detox Challenge', 'wellness seekers', 'wellness'),
-            ('Goal Setting Workbook', 'achievers', 'productivity'),
-            ('Time Management Mastery', 'busy professionals', 'productivity'),
-            ('Habit Tracker Templates', 'self-improvement', 'wellness'),
-            
-            # Health & Wellness
-            ('30-Day Fitness Planner', 'fitness enthusiasts', 'wellness'),
-            ('Meal Prep Made Simple', 'health conscious', 'wellness'),
-            ('Mental Health Journal', 'wellness seekers', 'wellness'),
-            ('Stress Management Guide', 'professionals', 'wellness'),
-            ('Sleep Optimization Blueprint', 'health optimizers', 'wellness'),
-            
-            # Finance & Investment
-            ('Personal Finance Tracker', 'young adults', 'finance'),
-            ('Cryptocurrency Basics', 'crypto beginners', 'finance'),
-            ('Retirement Planning Guide', 'adults 30+', 'finance'),
-            ('Side Hustle Starter Kit', 'income seekers', 'business'),
-            ('Budgeting Templates Bundle', 'savers', 'finance')
-        ]
+        # The launcher's one analytics cache: persisted across runs so repeated CLI
+        # invocations skip WHOP, and shared by the pricing and report steps of a cycle
+        cache_dir = Path('cache')
+        cache_dir.mkdir(exist_ok=True)
+        self._persist = sqlite3.connect(str(cache_dir / 'analytics.sqlite'), check_same_thread=False)
+        self._persist.execute(
+            "CREATE TABLE IF NOT EXISTS analytics (pid TEXT PRIMARY KEY, ts REAL, blob BLOB)"
+        )
+        self._persist_lock = threading.Lock()
+        
+        # Paces API-bound work; only sleeps when calls outrun the allowance
+        self._rate = TokenBucket(rate=5, burst=10)
+        self._upload_lock = threading.Lock()
+        
+        # Set once the webhook receiver is serving and pushing events into the index
+        self._webhook_thread: Optional[threading.Thread] = None
+        
+        self.profitable_niches = PROFITABLE_NICHES
         
         self.daily_targets = {
             'ebooks': 2,
@@ -78,39 +174,93 @@ class AutoLauncher:
     def _load_config(self) -> dict:
         """Load automation configuration"""
         config_file = Path('config/automation_config.json')
+        mtime = config_file.stat().st_mtime if config_file.exists() else 0
+        # Deep copy: nested sections like upload_settings must not be shared with the cache
+        return copy.deepcopy(_read_config_cached(str(config_file), mtime))
+    
+    def _iter_auto_generated(self) -> Iterator[dict]:
+        """Stream the auto-generated products from the local webhook-fed index"""
+        self._ensure_product_index()
+        lookup = WhopIntegration._lookup
+        for product in self.product_index.iter_products():
+            if all(lookup(product, key) == value for key, value in AUTO_GENERATED_FILTER.items()):
+                yield product
+    
+    def _ensure_product_index(self):
+        """Fill the product index from WHOP if it is empty or too old"""
+        max_age = PRODUCT_INDEX_MAX_AGE if self._webhook_thread else PRODUCT_INDEX_POLL_AGE
+        warmed_at = self.product_index.warmed_at()
+        if warmed_at is None or time.time() - warmed_at > max_age:
+            self.product_index.warm(self.whop, page_size=PRODUCT_BATCH_SIZE)
+    
+    @staticmethod
+    def _batched(items: Iterable, size: int) -> Iterator[list]:
+        """Group an iterable into lists of at most size items"""
+        iterator = iter(items)
+        while True:
+            batch = list(islice(iterator, size))
+            if not batch:
+                return
+            yield batch
+    
+    def _get_analytics(self, product_id: str, ttl: float = ANALYTICS_DISK_TTL) -> dict:
+        """Fetch product analytics from the on-disk cache, falling back to WHOP"""
+        with self._persist_lock:
+            row = self._persist.execute(
+                "SELECT ts, blob FROM analytics WHERE pid = ?", (product_id,)
+            ).fetchone()
         
-        default_config = {
-            'auto_generate': True,
-            'auto_upload': True,
-            'generation_interval_hours': 6,
-            'upload_interval_hours': 2,
-            'max_daily_products': 10,
-            'price_optimization': True,
-            'seo_optimization': True,
-            'webhook_notifications': True
-        }
+        if row and time.time() - row[0] < ttl:
+            return orjson.loads(row[1])
+        
+        analytics = self.whop.get_product_analytics(product_id)
+        if analytics is not None:
+            with self._persist_lock, self._persist:
+                self._persist.execute(
+                    "INSERT OR REPLACE INTO analytics (pid, ts, blob) VALUES (?, ?, ?)",
+                    (product_id, time.time(), orjson.dumps(analytics))
+                )
         
-        if config_file.exists():
-            with open(config_file, 'r') as f:
-                user_config = json.load(f)
-                default_config.update(user_config)
+        return analytics
+    
+    def _fetch_all_analytics(self, product_ids: List[str]) -> Dict[str, dict]:
+        """Fetch analytics for many products concurrently, keyed by product ID"""
+        if not product_ids:
+            return {}
         
-        return default_config
+        workers = min(ANALYTICS_CONCURRENCY, len(product_ids))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return dict(zip(product_ids, executor.map(self._get_analytics, product_ids)))
+    
+    def _update_price(self, product_id: str, new_price: int) -> bool:
+        """Update a product price and drop the cached data it invalidates"""
+        updated = self.whop.update_product_pricing(product_id, new_price)
+        if updated:
+            self.product_index.update_fields(product_id, {'price': new_price})
+            with self._persist_lock, self._persist:
+                self._persist.execute("DELETE FROM analytics WHERE pid = ?", (product_id,))
+        return updated
     
     def run_daily_automation(self):
         """Main automation routine - runs daily"""
         self.logger.info("🚀 Starting daily automation cycle")
         
         try:
-            # Generate new products
-            if self.config['auto_generate']:
-                generated_count = self._generate_daily_products()
-                self.logger.info(f"🎯 Generated {generated_count} products")
+            # Generate new products and upload them to WHOP
+            if self.config['auto_generate'] and self.config['auto_upload']:
+                generated_count, upload_results = self._generate_and_upload_products()
+            elif self.config['auto_generate']:
+                generated_count, upload_results = self._generate_daily_products(), None
+            elif self.config['auto_upload']:
+                generated_count, upload_results = None, self._upload_pending_products()
+            else:
+                generated_count = upload_results = None
             
-            # Upload products to WHOP
-            if self.config['auto_upload']:
-                upload_results = self._upload_pending_products()
-                self.logger.info(f"📦 Upload results: {upload_results['success']} success, {upload_results['failed']} failed")
+            if generated_count is not None:
+                self.logger.info("🎯 Generated %s products", generated_count)
+            if upload_results is not None:
+                self.logger.info("📦 Upload results: %s success, %s failed",
+                                 upload_results['success'], upload_results['failed'])
             
             # Optimize existing products
             if self.config['price_optimization']:
@@ -122,160 +272,285 @@ class AutoLauncher:
             self.logger.info("✅ Daily automation cycle completed successfully")
             
         except Exception as e:
-            self.logger.error(f"❌ Daily automation failed: {e}")
+            self.logger.error("❌ Daily automation failed: %s", e)
     
-    def _generate_daily_products(self) -> int:
-        """Generate daily quota of products"""
+    def _generate_daily_products(self, on_generated: Optional[Callable[[dict], Any]] = None) -> int:
+        """Generate daily quota of products, passing each one to on_generated if given"""
         generated_count = 0
         
+        # Niche for the Nth successful product today, precomputed for the whole quota
+        niches = self.profitable_niches
+        picks = tuple(niches[n % len(niches)] for n in range(sum(self.daily_targets.values())))
+        
+        # Bind hot lookups once rather than on every iteration
+        log_info = self.logger.info
+        log_error = self.logger.error
+        acquire = self._rate.acquire
+        gen_ebook = self.generator.generate_ebook
+        gen_notion = self.generator.generate_notion_template
+        gen_planner = self.generator.generate_planner_template
+        gen_emails = self.generator.generate_email_templates
+        template_types = ('productivity dashboard', 'project tracker', 'content calendar', 'business planner')
+        periods = ('daily', 'weekly', 'monthly')
+        
         for product_type, target_count in self.daily_targets.items():
             for i in range(target_count):
                 try:
-                    # Select random niche
-                    niche_data = self.profitable_niches[generated_count % len(self.profitable_niches)]
-                    topic, audience, category = niche_data
+                    # Rotate through niches
+                    topic, audience, category = picks[generated_count]
                     
+                    acquire()
                     if product_type == 'ebooks':
-                        result = self.generator.generate_ebook(topic, audience)
+                        result = gen_ebook(topic, audience)
                     elif product_type == 'templates':
-                        template_types = ['productivity dashboard', 'project tracker', 'content calendar', 'business planner']
-                        template_type = template_types[i % len(template_types)]
-                        result = self.generator.generate_notion_template(template_type, topic)
+                        result = gen_notion(template_types[i % len(template_types)], topic)
                     elif product_type == 'planners':
-                        periods = ['daily', 'weekly', 'monthly']
-                        period = periods[i % len(periods)]
-                        result = self.generator.generate_planner_template(category, period)
+                        result = gen_planner(category, periods[i % len(periods)])
                     elif product_type == 'email_templates':
-                        result = self.generator.generate_email_templates(category, 5)
+                        result = gen_emails(category, 5)
                     
                     if result:
                         generated_count += 1
-                        self.logger.info(f"✅ Generated {product_type}: {result.get('title', 'Untitled')}")
-                    
-                    # Small delay to avoid rate limits
-                    time.sleep(2)
+                        log_info("✅ Generated %s: %s", product_type, result.get('title', 'Untitled'))
+                        if on_generated:
+                            on_generated(result)
                     
                 except Exception as e:
-                    self.logger.error(f"❌ Failed to generate {product_type}: {e}")
+                    log_error("❌ Failed to generate %s: %s", product_type, e)
         
         return generated_count
     
+    def _generate_and_upload_products(self) -> Tuple[int, dict]:
+        """Generate the daily quota while uploading each product as soon as it is ready"""
+        results = {'success': 0, 'failed': 0, 'products': []}
+        pending: "queue.Queue[Optional[dict]]" = queue.Queue()
+        
+        def upload_worker():
+            with self._upload_lock:
+                self.whop.warm_up()  # Handshake while the first product is still generating
+                while True:
+                    product = pending.get()
+                    if product is None:
+                        return
+                    try:
+                        self.uploader.upload_product(product, results)
+                    except Exception as e:
+                        self.logger.error("❌ Failed to upload %s: %s", product.get('title', 'Untitled'), e)
+                        results['failed'] += 1
+        
+        def generate():
+            try:
+                return self._generate_daily_products(on_generated=pending.put)
+            finally:
+                pending.put(None)  # Let the uploader drain and stop
+        
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            uploading = executor.submit(upload_worker)
+            generating = executor.submit(generate)
+            generated_count = generating.result()
+            uploading.result()
+        
+        return generated_count, results
+    
     def _upload_pending_products(self) -> dict:
         """Upload all pending products to WHOP"""
-        return self.uploader.upload_products_from_directory('generated_products')
+        upload_settings = self.config.get('upload_settings', {})
+        
+        # Scheduled jobs run concurrently; never upload the same directory twice at once
+        with self._upload_lock:
+            if upload_settings.get('async_uploads'):
+                return asyncio.run(self.uploader.upload_products_from_directory_async(
+                    'generated_products',
+                    concurrency=upload_settings.get('max_concurrent_uploads', 8)
+                ))
+            
+            return self.uploader.upload_products_from_directory('generated_products')
     
     def _optimize_product_prices(self):
         """Optimize pricing based on performance data"""
         self.logger.info("💰 Starting price optimization")
         
         try:
-            products = self.whop.list_products()
+            update_price = self._update_price
+            acquire = self._rate.acquire
+            log_info = self.logger.info
             
-            for product in products:
-                if product.get('metadata', {}).get('auto_generated'):
-                    # Get analytics
-                    analytics = self.whop.get_product_analytics(product['id'])
-                    
-                    if analytics:
-                        # Simple optimization logic
-                        views = analytics.get('views', 0)
-                        purchases = analytics.get('purchases', 0)
-                        current_price = product.get('price', 0)
-                        
-                        # If high views but low conversion, reduce price
-                        if views > 100 and purchases < 5:
-                            new_price = int(current_price * 0.8)  # 20% reduction
-                            self.whop.update_product_pricing(product['id'], new_price)
-                            self.logger.info(f"💰 Reduced price for {product['title']}")
-                        
-                        # If good conversion rate, increase price
-                        elif views > 50 and purchases > 10:
-                            conversion_rate = purchases / views
-                            if conversion_rate > 0.1:  # 10% conversion rate
-                                new_price = int(current_price * 1.2)  # 20% increase
-                                self.whop.update_product_pricing(product['id'], new_price)
-                                self.logger.info(f"💰 Increased price for {product['title']}")
-                    
-                    time.sleep(1)  # Rate limiting
+            for batch in self._batched(self._iter_auto_generated(), PRODUCT_BATCH_SIZE):
+                get_analytics = self._fetch_all_analytics([p['id'] for p in batch]).get
+                
+                priced = [(p, a) for p in batch if (a := get_analytics(p['id']))]
+                if not priced:
+                    continue
+                
+                views = np.array([a.get('views', 0) for _, a in priced], dtype=float)
+                purchases = np.array([a.get('purchases', 0) for _, a in priced], dtype=float)
+                prices = np.array([p.get('price', 0) for p, _ in priced], dtype=float)
+                new_prices = self._reprice(views, purchases, prices)
+                
+                for i in np.flatnonzero(new_prices != prices):
+                    product = priced[i][0]
+                    acquire()
+                    update_price(product['id'], int(new_prices[i]))
+                    direction = "Reduced" if new_prices[i] < prices[i] else "Increased"
+                    log_info("💰 %s price for %s", direction, product['title'])
         
         except Exception as e:
-            self.logger.error(f"❌ Price optimization failed: {e}")
+            self.logger.error("❌ Price optimization failed: %s", e)
+    
+    @staticmethod
+    def _reprice(views: np.ndarray, purchases: np.ndarray, prices: np.ndarray) -> np.ndarray:
+        """Apply the pricing rules to whole arrays of product stats at once"""
+        # High views but low conversion: reduce price 20%
+        down = (views > 100) & (purchases < 5)
+        
+        # Good conversion rate (over 10%): increase price 20%
+        up = (views > 50) & (purchases > 10) & (purchases / np.maximum(views, 1) > 0.1)
+        
+        new_prices = prices.copy()
+        new_prices[down] = np.trunc(prices[down] * 0.8)
+        new_prices[up] = np.trunc(prices[up] * 1.2)
+        return new_prices
     
     def _generate_daily_report(self):
         """Generate daily performance report"""
         self.logger.info("📊 Generating daily report")
         
+        now = datetime.now()
+        today = now.strftime('%Y%m%d')
+        
         try:
-            # Get all products
-            products = self.whop.list_products()
-            auto_generated = [p for p in products if p.get('metadata', {}).get('auto_generated')]
-            
-            # Calculate metrics
-            total_products = len(auto_generated)
+            # Calculate metrics over the streamed catalog
+            total_products = 0
             total_revenue = 0
             total_sales = 0
             
-            for product in auto_generated:
-                analytics = self.whop.get_product_analytics(product['id'])
-                if analytics:
-                    total_sales += analytics.get('purchases', 0)
-                    total_revenue += analytics.get('revenue', 0)
+            for batch in self._batched(self._iter_auto_generated(), PRODUCT_BATCH_SIZE):
+                total_products += len(batch)
+                for analytics in self._fetch_all_analytics([p['id'] for p in batch]).values():
+                    if analytics:
+                        total_sales += analytics.get('purchases', 0)
+                        total_revenue += analytics.get('revenue', 0)
             
             # Create report
             report = {
-                'date': datetime.now().strftime('%Y-%m-%d'),
+                'date': now.strftime('%Y-%m-%d'),
                 'total_products': total_products,
                 'total_sales': total_sales,
                 'total_revenue': total_revenue / 100 if total_revenue else 0,  # Convert from cents
                 'average_price': (total_revenue / total_sales / 100) if total_sales else 0,
-                'generated_today': len(list(Path('generated_products').glob(f"*{datetime.now().strftime('%Y%m%d')}*.json")))
+                'generated_today': self._count_generated_on(today)
             }
             
             # Save report
             reports_dir = Path('reports')
             reports_dir.mkdir(exist_ok=True)
             
-            report_file = reports_dir / f"daily_report_{datetime.now().strftime('%Y%m%d')}.json"
-            with open(report_file, 'w') as f:
-                json.dump(report, f, indent=2)
+            report_file = reports_dir / f"daily_report_{today}.json"
+            with open(report_file, 'wb') as f:
+                f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+            
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("📊 Report payload: %s", orjson.dumps(report).decode())
             
-            self.logger.info(f"📊 Report saved: ${report['total_revenue']:.2f} revenue, {report['total_sales']} sales")
+            self.logger.info("📊 Report saved: $%.2f revenue, %s sales", report['total_revenue'], report['total_sales'])
             
         except Exception as e:
-            self.logger.error(f"❌ Report generation failed: {e}")
+            self.logger.error("❌ Report generation failed: %s", e)
+    
+    @staticmethod
+    def _count_generated_on(day: str, products_dir: str = 'generated_products') -> int:
+        """Count product files whose name carries the given YYYYMMDD stamp"""
+        try:
+            with os.scandir(products_dir) as entries:
+                return sum(1 for e in entries if e.name.endswith('.json') and day in e.name)
+        except FileNotFoundError:
+            return 0
     
     def run_continuous(self):
         """Run continuous automation with scheduling"""
         self.logger.info("🎆 Starting continuous automation system")
         
-        # Schedule daily full automation
-        schedule.every().day.at("09:00").do(self.run_daily_automation)
+        # Receive product events, warm the local product index, then run initial cycle
+        self._start_webhook_receiver()
+        self._ensure_product_index()
+        self.run_daily_automation()
         
-        # Schedule hourly mini-generations
-        schedule.every(2).hours.do(self._mini_generation_cycle)
+        try:
+            asyncio.run(self._run_schedules())
+        except KeyboardInterrupt:
+            self.logger.info("🛑 Automation stopped by user")
+    
+    def _start_webhook_receiver(self):
+        """Serve WHOP webhooks into the product index when WHOP_WEBHOOK_PORT is set"""
+        port = os.getenv('WHOP_WEBHOOK_PORT')
+        if not port or self._webhook_thread:
+            return
         
-        # Schedule price optimization
-        schedule.every().day.at("15:00").do(self._optimize_product_prices)
+        # Imported lazily so the launcher runs without fastapi/uvicorn when webhooks are off
+        from whop_api.webhook_server import serve_in_background
+        self._webhook_thread = serve_in_background(self.product_index, int(port))
+    
+    async def _run_schedules(self):
+        """Drive every scheduled job from the event loop's timer heap"""
+        jobs = [
+            # Daily full automation
+            self._run_daily_at("09:00", self.run_daily_automation),
+            
+            # Mini-generations every 2 hours
+            self._run_every(2 * 3600, self._mini_generation_cycle),
+            
+            # Daily price optimization
+            self._run_daily_at("15:00", self._optimize_product_prices),
+            
+            # Uploads every 3 hours
+            self._run_every(3 * 3600, self._upload_pending_products)
+        ]
         
-        # Schedule uploads
-        schedule.every(3).hours.do(self._upload_pending_products)
+        # Timers may fire together; jobs still run one at a time, as the schedule loop did
+        self._job_lock = asyncio.Lock()
         
         self.logger.info("🔄 Automation schedules set up")
+        await asyncio.gather(*jobs)
+    
+    async def _run_every(self, interval_seconds: float, job: Callable[[], Any]):
+        """Run job every interval_seconds, starting one interval from now"""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            await self._run_job(job)
+    
+    async def _run_daily_at(self, at: str, job: Callable[[], Any]):
+        """Run job every day at the given HH:MM local time"""
+        hour, minute = map(int, at.split(':'))
         
-        # Run initial cycle
-        self.run_daily_automation()
-        
-        # Keep running
         while True:
-            try:
-                schedule.run_pending()
-                time.sleep(60)  # Check every minute
-            except KeyboardInterrupt:
-                self.logger.info("🛑 Automation stopped by user")
-                break
-            except Exception as e:
-                self.logger.error(f"❌ Automation error: {e}")
-                time.sleep(300)  # Wait 5 minutes before retrying
+            now = datetime.now()
+            next_run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            if next_run <= now:
+                next_run += timedelta(days=1)
+            
+            await asyncio.sleep((next_run - now).total_seconds())
+            await self._run_job(job)
+    
+    async def _run_job(self, job: Callable[[], Any]):
+        """Run a blocking job off the event loop, after any job that is already running"""
+        async with self._job_lock:
+            loop = asyncio.get_running_loop()
+            finished = loop.create_future()
+            
+            def run():
+                try:
+                    job()
+                except Exception as e:
+                    self.logger.error("❌ Automation error: %s", e)
+                finally:
+                    try:
+                        loop.call_soon_threadsafe(lambda: finished.done() or finished.set_result(None))
+                    except RuntimeError:
+                        pass  # Loop already closed by Ctrl+C
+            
+            # A daemon thread, unlike the default executor, doesn't hold up Ctrl+C until the job ends
+            threading.Thread(target=run, name='automation-job', daemon=True).start()
+            await finished
     
     def _mini_generation_cycle(self):
         """Generate 1-2 products every few hours"""
@@ -283,20 +558,21 @@ class AutoLauncher:
         
         try:
             # Generate 1-2 quick products
-            niche_data = self.profitable_niches[datetime.now().hour % len(self.profitable_niches)]
+            hour = datetime.now().hour
+            niche_data = self.profitable_niches[hour % len(self.profitable_niches)]
             topic, audience, category = niche_data
             
             # Alternate between product types
-            if datetime.now().hour % 2 == 0:
+            if hour % 2 == 0:
                 result = self.generator.generate_ebook(topic, audience)
             else:
                 result = self.generator.generate_notion_template('productivity template', topic)
             
             if result:
-                self.logger.info(f"✅ Mini-cycle generated: {result.get('title')}")
+                self.logger.info("✅ Mini-cycle generated: %s", result.get('title'))
         
         except Exception as e:
-            self.logger.error(f"❌ Mini-cycle failed: {e}")
+            self.logger.error("❌ Mini-cycle failed: %s", e)
     
     def setup_webhooks(self):
         """Setup WHOP webhooks for real-time notifications"""
@@ -304,43 +580,49 @@ class AutoLauncher:
             'purchase.created',
             'membership.created',
             'subscription.created',
-            'payment.succeeded'
+            'payment.succeeded',
+            'product.created',
+            'product.updated',
+            'product.deleted'
         ]
         
-        # You would replace this with your actual webhook URL
-        webhook_url = "https://your-domain.com/webhook/whop"
+        # Public URL of the receiver started by run_continuous (WHOP_WEBHOOK_PORT)
+        webhook_url = os.getenv('WEBHOOK_URL', "https://your-domain.com/webhook/whop")
+        secret = os.getenv('WHOP_WEBHOOK_SECRET')
+        if secret:
+            webhook_url += ('&' if '?' in webhook_url else '?') + urlencode({'token': secret})
         
         webhook_id = self.whop.setup_webhook(webhook_url, webhook_events)
         
         if webhook_id:
-            self.logger.info(f"🔗 Webhooks configured: {webhook_id}")
+            self.logger.info("🔗 Webhooks configured: %s", webhook_id)
         else:
             self.logger.error("❌ Failed to setup webhooks")
     
     def get_performance_summary(self) -> dict:
         """Get current performance summary"""
         try:
-            products = self.whop.list_products()
-            auto_generated = [p for p in products if p.get('metadata', {}).get('auto_generated')]
+            products = self._iter_auto_generated()
+            sample = list(islice(products, 10))  # Sample first 10 for performance
+            total_products = len(sample) + sum(1 for _ in products)
             
             total_revenue = 0
             total_sales = 0
             
-            for product in auto_generated[:10]:  # Sample first 10 for performance
-                analytics = self.whop.get_product_analytics(product['id'])
+            for analytics in self._fetch_all_analytics([p['id'] for p in sample]).values():
                 if analytics:
                     total_sales += analytics.get('purchases', 0)
                     total_revenue += analytics.get('revenue', 0)
             
             return {
-                'total_products': len(auto_generated),
-                'estimated_sales': total_sales * (len(auto_generated) / min(10, len(auto_generated))),
-                'estimated_revenue': (total_revenue / 100) * (len(auto_generated) / min(10, len(auto_generated))),
+                'total_products': total_products,
+                'estimated_sales': total_sales * (total_products / min(10, total_products)),
+                'estimated_revenue': (total_revenue / 100) * (total_products / min(10, total_products)),
                 'last_updated': datetime.now().isoformat()
             }
         
         except Exception as e:
-            self.logger.error(f"❌ Performance summary failed: {e}")
+            self.logger.error("❌ Performance summary failed: %s", e)
             return {'error': str(e)}
 
 def main():
@@ -4,319 +4,844 @@ AI Product Generator - Creates PLR/MRR digital products automatically
 Part of Nosyt WHOP Automation System
 """
 
-import openai
-import json
+from openai import AsyncOpenAI
+import aiofiles
+import argparse
+import asyncio
+import functools
+import httpx
+import importlib.util
+import orjson
 import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 import requests
 from pathlib import Path
 
+# Resolve the generators package when this file is run directly as a script
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from generators.parallel_processor import RateLimiter, run_requests
+from generators.llm_cache import SqliteCache, cache_key, is_cacheable
+
+try:
+    import tiktoken  # Exact prompt token counts for the rate limiter (in requirements.txt)
+except ImportError:
+    tiktoken = None
+
+# Reply budgets: chapters scale with their word target, structured JSON gets a fixed cap
+TOKENS_PER_WORD = 1.4
+CHAPTER_TARGET_WORDS = 1200  # Upper end of the 800-1200 words the chapter prompt asks for
+STRUCTURED_MAX_TOKENS = 1200
+
+# Packages with more text than this are serialized in a worker process
+LARGE_PACKAGE_BYTES = 256 * 1024
+
+# Connection pool size shared by all concurrent OpenAI requests on an event loop
+OPENAI_MAX_CONN = int(os.getenv('OPENAI_MAX_CONN', 50))
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+# Seconds between status checks on a submitted batch
+BATCH_POLL_INTERVAL = 30
+
+# SEO tags per category; a category applies when any word of its name appears in the content
+TAG_CATEGORIES = {
+    'business': ['business', 'entrepreneur', 'startup', 'marketing', 'sales'],
+    'productivity': ['productivity', 'organization', 'planning', 'efficiency', 'workflow'],
+    'health': ['health', 'wellness', 'fitness', 'nutrition', 'lifestyle'],
+    'finance': ['finance', 'money', 'investing', 'budgeting', 'wealth'],
+    'social media': ['social media', 'content', 'instagram', 'tiktok', 'marketing'],
+    'real estate': ['real estate', 'property', 'investing', 'landlord', 'rental']
+}
+GENERIC_TAGS = ['PLR', 'MRR', 'digital product', 'template', 'instant download']
+
+TAG_WORD_CATEGORIES: Dict[str, List[str]] = {}
+for _category in TAG_CATEGORIES:
+    for _word in _category.split():
+        TAG_WORD_CATEGORIES.setdefault(_word, []).append(_category)
+
+# Substring match, like the `word in content` test it replaces
+TAG_WORD_RE = re.compile("|".join(map(re.escape, TAG_WORD_CATEGORIES)), re.IGNORECASE)
+
+# Email post-processing: the first line mentioning "subject" with a colon, and the
+# first line containing a common call-to-action phrase
+SUBJ_RE = re.compile(r"^(?=[^\n]*subject)[^:\n]*:([^\n]*)", re.IGNORECASE | re.MULTILINE)
+CTA_RE = re.compile(r"^[^\n]*(?:click here|get started|buy now|learn more|sign up)[^\n]*", re.IGNORECASE | re.MULTILINE)
+
+# Niches whose topic contains one of these words also get a companion planner
+PLANNER_TOKENS = frozenset({'finance', 'wellness', 'productivity'})
+
+# JSON mode: the API guarantees a parseable object (the prompt must mention JSON)
+JSON_OBJECT = {"type": "json_object"}
+
+# Static system prompts. Everything request-specific goes in the user turn so
+# these stay an identical prefix across calls and hit OpenAI's prompt cache.
+EBOOK_OUTLINE_SYSTEM = """Create a detailed outline for a PLR ebook on the topic and for the audience given by the user.
+
+Include:
+- Compelling title
+- 8-12 chapter titles
+- Brief description of each chapter
+- Target word count (2000-5000 words)
+- 3 bonus sections
+- Call-to-action ideas
+
+Format as JSON with keys: title, subtitle, chapters, target_words, bonus_sections, cta_ideas"""
+
+CHAPTER_SYSTEM = """Write a comprehensive chapter for a PLR ebook. The user gives the ebook topic, target audience, chapter title and chapter description.
+
+Requirements:
+- 800-1200 words
+- Actionable advice
+- Professional tone
+- Include examples
+- Add bullet points and subheadings
+- End with key takeaways
+
+Make it valuable and engaging."""
+
+NOTION_SYSTEM = """Create a comprehensive Notion template of the type and for the use case given by the user.
+
+Include:
+- Template name and description
+- Database structures with properties
+- Page layouts and sections
+- Formulas and automations
+- Visual elements (icons, covers)
+- Instructions for customization
+- Use case examples
+
+Make it professional and highly functional.
+Format as JSON with detailed structure."""
+
+PLANNER_SYSTEM = """Create a comprehensive planner template for the period and planner type given by the user.
+
+Include:
+- Cover design concepts
+- Monthly/weekly/daily layouts
+- Goal-setting sections
+- Tracking pages
+- Reflection prompts
+- Customizable elements
+- Print and digital versions
+
+Make it visually appealing and highly functional.
+Format as JSON with detailed structure."""
+
+EMAIL_SYSTEM = """Create a high-converting email template of the type and for the industry given by the user.
+
+Include:
+- Compelling subject line
+- Email body with personalization
+- Clear call-to-action
+- Mobile-optimized format
+- A/B test variations
+
+Make it professional and conversion-focused."""
+
+DESCRIPTION_SYSTEM = """Write a compelling product description for a PLR digital product with the title and topic given by the user.
+
+Include:
+- Hook that grabs attention
+- Key benefits and features
+- What's included in the package
+- PLR/MRR rights explanation
+- Call-to-action
+
+Keep it under 200 words, sales-focused, and professional."""
+
+@functools.lru_cache(maxsize=None)
+def _encoding(model: str):
+    """
+    The tiktoken encoding for a model, or None when tiktoken is not installed
+    """
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+def count_tokens(text: str, model: str) -> int:
+    """
+    Count prompt tokens exactly with tiktoken, or estimate ~4 characters per token
+    """
+    encoding = _encoding(model)
+    return len(encoding.encode(text)) if encoding else len(text) // 4
+
+def _serialize(obj: Any) -> bytes:
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+_serializer_pool: Optional[ProcessPoolExecutor] = None
+
+def _get_serializer_pool() -> ProcessPoolExecutor:
+    """
+    Process pool for serializing large packages, started on first use
+    """
+    global _serializer_pool
+    if _serializer_pool is None:
+        _serializer_pool = ProcessPoolExecutor(max_workers=min(4, os.cpu_count() or 1))
+    return _serializer_pool
+
+async def _dump(obj: Any, path: Path, size_hint: int = 0):
+    """
+    Write a product package as indented JSON without blocking the event loop
+    
+    Packages whose text is expected to exceed LARGE_PACKAGE_BYTES are serialized
+    in a worker process so the formatting work doesn't hold the GIL; smaller ones
+    aren't worth the pickling round-trip.
+    """
+    if size_hint > LARGE_PACKAGE_BYTES:
+        data = await asyncio.get_running_loop().run_in_executor(_get_serializer_pool(), _serialize, obj)
+    else:
+        data = _serialize(obj)
+    
+    async with aiofiles.open(path, 'wb') as f:
+        await f.write(data)
+
+_loads = orjson.loads
+
 class AIProductGenerator:
+    # Structured outlines/templates and long-form prose both run on the small fast model
+    OUTLINE_MODEL = "gpt-4o-mini"
+    CONTENT_MODEL = "gpt-4o-mini"
+    
     def __init__(self, api_key: str = None):
         self.api_key = api_key or os.getenv('OPENAI_API_KEY')
-        openai.api_key = self.api_key
         self.products_dir = Path('generated_products')
         self.products_dir.mkdir(exist_ok=True)
         
-    def generate_ebook(self, topic: str, target_audience: str = "general") -> Dict[str, Any]:
+        # Async clients are bound to the event loop they were created on
+        self._clients: Dict[asyncio.AbstractEventLoop, AsyncOpenAI] = {}
+        
+        # One RPM/TPM budget for every request this generator makes
+        self._limiter = RateLimiter.from_env()
+        
+        # Replies to low-temperature prompts are replayed from disk on re-runs
+        self._cache = SqliteCache()
+        
+        # Package paths handed out by _package_path, so concurrent saves never share a file
+        self._reserved_paths = set()
+    
+    def _client(self) -> AsyncOpenAI:
         """
-        Generate a complete PLR ebook with chapters, content, and metadata
+        Get the OpenAI client for the running event loop, creating it on first use
         """
-        print(f"🤖 Generating ebook: {topic}")
-        
-        # Generate ebook outline
-        outline_prompt = f"""
-        Create a detailed outline for a PLR ebook about "{topic}" targeting {target_audience}.
+        loop = asyncio.get_running_loop()
+        if loop not in self._clients:
+            # One pooled keep-alive connection set (HTTP/2 when h2 is installed) for every call on this loop
+            http_client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(max_connections=OPENAI_MAX_CONN, max_keepalive_connections=20),
+                timeout=httpx.Timeout(60.0, connect=5.0)
+            )
+            self._clients[loop] = AsyncOpenAI(api_key=self.api_key, http_client=http_client)
+        return self._clients[loop]
+    
+    async def aclose(self):
+        """
+        Close the OpenAI client for the running event loop
+        """
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client:
+            await client.close()
+    
+    def _run(self, coro):
+        """
+        Run a generator coroutine to completion from synchronous code
+        """
+        async def runner():
+            try:
+                return await coro
+            finally:
+                await self.aclose()
         
-        Include:
-        - Compelling title
-        - 8-12 chapter titles
-        - Brief description of each chapter
-        - Target word count (2000-5000 words)
-        - 3 bonus sections
-        - Call-to-action ideas
+        return asyncio.run(runner())
+    
+    @staticmethod
+    def _messages(system: str, user: str) -> List[Dict[str, str]]:
+        """
+        Pair a static system prompt with the request-specific user turn
+        """
+        return [{"role": "system", "content": system}, {"role": "user", "content": user}]
+    
+    @staticmethod
+    def _job(model: str, messages: List[Dict[str, str]], **params) -> Dict[str, Any]:
+        """
+        Build a chat job with its estimated token cost
+        """
+        prompt_tokens = sum(count_tokens(message['content'], model) for message in messages)
+        return {
+            "model": model,
+            "messages": messages,
+            **params,
+            "est_tokens": prompt_tokens + params.get('max_tokens', 1000)
+        }
+    
+    async def _complete_many(self, jobs: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Run chat jobs within the shared rate limits; failed jobs come back as exceptions
         
-        Format as JSON with keys: title, subtitle, chapters, target_words, bonus_sections, cta_ideas
+        Cacheable jobs are answered from the local response cache when possible.
+        """
+        replies: List[Any] = [None] * len(jobs)
+        misses = []
+        
+        for index, job in enumerate(jobs):
+            key = cache_key(job) if is_cacheable(job) else None
+            cached = self._cache.get(key) if key else None
+            if cached is not None:
+                replies[index] = cached
+            else:
+                misses.append((index, key))
+        
+        if misses:
+            results = await run_requests(self._client(), [jobs[index] for index, _ in misses], self._limiter)
+            for (index, key), reply in zip(misses, results):
+                replies[index] = reply
+                if key and not isinstance(reply, Exception):
+                    self._cache.set(key, reply)
+        
+        return replies
+    
+    async def _chat(self, model: str, messages: List[Dict[str, str]], **params) -> str:
+        """
+        Send a chat completion and return the reply text
+        """
+        reply, = await self._complete_many([self._job(model, messages, **params)])
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+    
+    def generate_ebook(self, topic: str, target_audience: str = "general") -> Dict[str, Any]:
+        """
+        Generate a complete PLR ebook with chapters, content, and metadata
         """
+        return self._run(self.generate_ebook_async(topic, target_audience))
+    
+    async def generate_ebook_async(self, topic: str, target_audience: str = "general") -> Dict[str, Any]:
+        """
+        Generate a complete PLR ebook, writing all chapters concurrently
+        """
+        print(f"🤖 Generating ebook: {topic}")
         
         try:
-            outline_response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": outline_prompt}],
-                temperature=0.7
-            )
+            outline = _loads(await self._chat(
+                self.OUTLINE_MODEL, self._outline_messages(topic, target_audience),
+                temperature=0.7, max_tokens=STRUCTURED_MAX_TOKENS, response_format=JSON_OBJECT
+            ))
             
-            outline = json.loads(outline_response.choices[0].message.content)
+            # Generate full content, all chapters in flight at once
+            chapter_tasks = [
+                asyncio.ensure_future(self._generate_chapter_content(chapter, topic, target_audience))
+                for chapter in outline['chapters']
+            ]
+            description_task = asyncio.ensure_future(self._generate_description(outline['title'], topic))
             
-            # Generate full content
-            content_sections = []
-            for chapter in outline['chapters']:
-                chapter_content = self._generate_chapter_content(chapter, topic, target_audience)
-                content_sections.append({
-                    'title': chapter['title'],
-                    'content': chapter_content
-                })
+            # Stream chapters to disk in order as they complete, counting words on the way
+            created_at, stamp = self._now_pair()
+            filepath = self._package_path(f"ebook_{self._slug(topic)}", stamp)
+            chapters_path = filepath.with_suffix('.jsonl')
+            total_words = 0
             
-            # Create ebook package
-            ebook_package = {
-                'type': 'ebook',
-                'title': outline['title'],
-                'subtitle': outline.get('subtitle', ''),
-                'topic': topic,
-                'target_audience': target_audience,
-                'chapters': content_sections,
-                'bonus_sections': outline.get('bonus_sections', []),
-                'word_count': sum(len(section['content'].split()) for section in content_sections),
-                'created_at': datetime.now().isoformat(),
-                'plr_rights': True,
-                'mrr_rights': True,
-                'suggested_price': self._calculate_price('ebook', len(content_sections)),
-                'tags': self._generate_tags(topic),
-                'description': self._generate_description(outline['title'], topic)
-            }
+            async with aiofiles.open(chapters_path, 'wb') as f:
+                for chapter, task in zip(outline['chapters'], chapter_tasks):
+                    content, word_count = await task
+                    await f.write(self._chapter_line(chapter, content))
+                    total_words += word_count
             
-            # Save to file
-            filename = f"ebook_{topic.replace(' ', '_').lower()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            filepath = self.products_dir / filename
-            
-            with open(filepath, 'w') as f:
-                json.dump(ebook_package, f, indent=2)
+            ebook_package = self._ebook_package(
+                topic, target_audience, outline, chapters_path, total_words, await description_task, created_at
+            )
+            await _dump(ebook_package, filepath)
             
             print(f"✅ Ebook generated: {filepath}")
             return ebook_package
-            
+        
         except Exception as e:
             print(f"❌ Error generating ebook: {e}")
             return None
     
+    def _outline_messages(self, topic: str, target_audience: str) -> List[Dict[str, str]]:
+        """
+        Build the chat messages for an ebook outline
+        """
+        return self._messages(EBOOK_OUTLINE_SYSTEM, f'Topic: "{topic}"\nTarget audience: {target_audience}')
+    
+    def _ebook_package(self, topic: str, target_audience: str, outline: Dict,
+                       chapters_path: Path, word_count: int, description: str, created_at: str) -> Dict[str, Any]:
+        """
+        Assemble ebook metadata; the chapter text lives in the JSONL file at chapters_path
+        """
+        chapter_count = len(outline['chapters'])
+        
+        return {
+            'type': 'ebook',
+            'title': outline['title'],
+            'subtitle': outline.get('subtitle', ''),
+            'topic': topic,
+            'target_audience': target_audience,
+            'chapters_file': str(chapters_path),
+            'chapter_count': chapter_count,
+            'bonus_sections': outline.get('bonus_sections', []),
+            'word_count': word_count,
+            'created_at': created_at,
+            'plr_rights': True,
+            'mrr_rights': True,
+            'suggested_price': self._calculate_price('ebook', chapter_count),
+            'tags': self._generate_tags(topic),
+            'description': description
+        }
+    
     def generate_notion_template(self, template_type: str, use_case: str) -> Dict[str, Any]:
         """
         Generate Notion template with structure and content
         """
-        print(f"📋 Generating Notion template: {template_type} for {use_case}")
-        
-        template_prompt = f"""
-        Create a comprehensive Notion template for {template_type} designed for {use_case}.
-        
-        Include:
-        - Template name and description
-        - Database structures with properties
-        - Page layouts and sections
-        - Formulas and automations
-        - Visual elements (icons, covers)
-        - Instructions for customization
-        - Use case examples
-        
-        Make it professional and highly functional.
-        Format as JSON with detailed structure.
+        return self._run(self.generate_notion_template_async(template_type, use_case))
+    
+    async def generate_notion_template_async(self, template_type: str, use_case: str) -> Dict[str, Any]:
+        """
+        Generate Notion template with structure and content
         """
+        print(f"📋 Generating Notion template: {template_type} for {use_case}")
         
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": template_prompt}],
-                temperature=0.6
-            )
-            
-            template_data = json.loads(response.choices[0].message.content)
+            template_data = _loads(await self._chat(
+                self.OUTLINE_MODEL, self._notion_messages(template_type, use_case),
+                temperature=0.6, max_tokens=STRUCTURED_MAX_TOKENS, response_format=JSON_OBJECT
+            ))
             
-            # Create template package
-            template_package = {
-                'type': 'notion_template',
-                'template_type': template_type,
-                'use_case': use_case,
-                'name': template_data.get('name', f"{template_type} Template"),
-                'description': template_data.get('description', ''),
-                'structure': template_data,
-                'created_at': datetime.now().isoformat(),
-                'plr_rights': True,
-                'suggested_price': self._calculate_price('notion_template', 1),
-                'tags': self._generate_tags(f"{template_type} {use_case}"),
-                'instructions': template_data.get('instructions', []),
-                'preview_images': []  # Will be generated separately
-            }
-            
-            # Save template
-            filename = f"notion_{template_type.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            filepath = self.products_dir / filename
-            
-            with open(filepath, 'w') as f:
-                json.dump(template_package, f, indent=2)
+            created_at, stamp = self._now_pair()
+            template_package = self._notion_package(template_type, use_case, template_data, created_at)
+            filepath = await self._save_package(f"notion_{self._slug(template_type)}", template_package, stamp)
             
             print(f"✅ Notion template generated: {filepath}")
             return template_package
-            
+        
         except Exception as e:
             print(f"❌ Error generating Notion template: {e}")
             return None
     
+    def _notion_messages(self, template_type: str, use_case: str) -> List[Dict[str, str]]:
+        """
+        Build the chat messages for a Notion template
+        """
+        return self._messages(NOTION_SYSTEM, f"Template type: {template_type}\nDesigned for: {use_case}")
+    
+    def _notion_package(self, template_type: str, use_case: str, template_data: Dict, created_at: str) -> Dict[str, Any]:
+        """
+        Assemble a Notion template package from the generated structure
+        """
+        return {
+            'type': 'notion_template',
+            'template_type': template_type,
+            'use_case': use_case,
+            'name': template_data.get('name', f"{template_type} Template"),
+            'description': template_data.get('description', ''),
+            'structure': template_data,
+            'created_at': created_at,
+            'plr_rights': True,
+            'suggested_price': self._calculate_price('notion_template', 1),
+            'tags': self._generate_tags(f"{template_type} {use_case}"),
+            'instructions': template_data.get('instructions', []),
+            'preview_images': []  # Will be generated separately
+        }
+    
     def generate_planner_template(self, planner_type: str, period: str = "monthly") -> Dict[str, Any]:
         """
         Generate digital planner templates
         """
-        print(f"📅 Generating {period} {planner_type} planner")
-        
-        planner_prompt = f"""
-        Create a comprehensive {period} {planner_type} planner template.
-        
-        Include:
-        - Cover design concepts
-        - Monthly/weekly/daily layouts
-        - Goal-setting sections
-        - Tracking pages
-        - Reflection prompts
-        - Customizable elements
-        - Print and digital versions
-        
-        Make it visually appealing and highly functional.
+        return self._run(self.generate_planner_template_async(planner_type, period))
+    
+    async def generate_planner_template_async(self, planner_type: str, period: str = "monthly") -> Dict[str, Any]:
+        """
+        Generate digital planner templates
         """
+        print(f"📅 Generating {period} {planner_type} planner")
         
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": planner_prompt}],
-                temperature=0.6
-            )
-            
-            planner_data = json.loads(response.choices[0].message.content)
-            
-            planner_package = {
-                'type': 'digital_planner',
-                'planner_type': planner_type,
-                'period': period,
-                'name': f"{period.title()} {planner_type.title()} Planner",
-                'description': planner_data.get('description', ''),
-                'layouts': planner_data,
-                'created_at': datetime.now().isoformat(),
-                'plr_rights': True,
-                'suggested_price': self._calculate_price('planner', 1),
-                'tags': self._generate_tags(f"{planner_type} planner {period}"),
-                'formats': ['PDF', 'PNG', 'Notion', 'GoodNotes'],
-                'customizable': True
-            }
+            planner_data = _loads(await self._chat(
+                self.OUTLINE_MODEL, self._planner_messages(planner_type, period),
+                temperature=0.6, max_tokens=STRUCTURED_MAX_TOKENS, response_format=JSON_OBJECT
+            ))
             
-            # Save planner
-            filename = f"planner_{planner_type.replace(' ', '_')}_{period}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            filepath = self.products_dir / filename
-            
-            with open(filepath, 'w') as f:
-                json.dump(planner_package, f, indent=2)
+            created_at, stamp = self._now_pair()
+            planner_package = self._planner_package(planner_type, period, planner_data, created_at)
+            filepath = await self._save_package(f"planner_{self._slug(planner_type)}_{period}", planner_package, stamp)
             
             print(f"✅ Planner generated: {filepath}")
             return planner_package
-            
+        
         except Exception as e:
             print(f"❌ Error generating planner: {e}")
             return None
     
+    def _planner_messages(self, planner_type: str, period: str) -> List[Dict[str, str]]:
+        """
+        Build the chat messages for a digital planner
+        """
+        return self._messages(PLANNER_SYSTEM, f"Planner: {period} {planner_type}")
+    
+    def _planner_package(self, planner_type: str, period: str, planner_data: Dict, created_at: str) -> Dict[str, Any]:
+        """
+        Assemble a planner package from the generated layouts
+        """
+        return {
+            'type': 'digital_planner',
+            'planner_type': planner_type,
+            'period': period,
+            'name': f"{period.title()} {planner_type.title()} Planner",
+            'description': planner_data.get('description', ''),
+            'layouts': planner_data,
+            'created_at': created_at,
+            'plr_rights': True,
+            'suggested_price': self._calculate_price('planner', 1),
+            'tags': self._generate_tags(f"{planner_type} planner {period}"),
+            'formats': ['PDF', 'PNG', 'Notion', 'GoodNotes'],
+            'customizable': True
+        }
+    
     def generate_email_templates(self, industry: str, template_count: int = 10) -> Dict[str, Any]:
         """
         Generate email template collections
         """
+        return self._run(self.generate_email_templates_async(industry, template_count))
+    
+    async def generate_email_templates_async(self, industry: str, template_count: int = 10) -> Dict[str, Any]:
+        """
+        Generate email template collections, requesting every template concurrently
+        """
         print(f"📧 Generating {template_count} email templates for {industry}")
         
-        templates = []
         template_types = [
             'welcome_series', 'sales_sequence', 'nurture_campaign', 
             'abandoned_cart', 'promotional', 'newsletter', 'follow_up',
             'onboarding', 'feedback_request', 'seasonal_campaign'
         ]
+        requested_types = [template_types[i % len(template_types)] for i in range(template_count)]
         
-        for i in range(template_count):
-            template_type = template_types[i % len(template_types)]
-            
-            template_prompt = f"""
-            Create a high-converting {template_type} email template for {industry} businesses.
-            
-            Include:
-            - Compelling subject line
-            - Email body with personalization
-            - Clear call-to-action
-            - Mobile-optimized format
-            - A/B test variations
-            
-            Make it professional and conversion-focused.
-            """
-            
-            try:
-                response = openai.ChatCompletion.create(
-                    model="gpt-4",
-                    messages=[{"role": "user", "content": template_prompt}],
-                    temperature=0.7
-                )
-                
-                template_content = response.choices[0].message.content
-                
-                templates.append({
-                    'type': template_type,
-                    'subject_line': self._extract_subject_line(template_content),
-                    'content': template_content,
-                    'cta': self._extract_cta(template_content),
-                    'personalization_fields': ['[FIRST_NAME]', '[COMPANY]', '[PRODUCT]']
-                })
-                
-            except Exception as e:
-                print(f"❌ Error generating template {i+1}: {e}")
+        responses = await self._complete_many([
+            self._job(self.CONTENT_MODEL, self._email_template_messages(template_type, industry), temperature=0.7)
+            for template_type in requested_types
+        ])
+        
+        templates = []
+        for i, (template_type, template_content) in enumerate(zip(requested_types, responses)):
+            if isinstance(template_content, Exception):
+                print(f"❌ Error generating template {i+1}: {template_content}")
                 continue
+            
+            templates.append({
+                'type': template_type,
+                'subject_line': self._extract_subject_line(template_content),
+                'content': template_content,
+                'cta': self._extract_cta(template_content),
+                'personalization_fields': ['[FIRST_NAME]', '[COMPANY]', '[PRODUCT]']
+            })
         
         # Create email template package
+        created_at, stamp = self._now_pair()
         email_package = {
             'type': 'email_templates',
             'industry': industry,
             'template_count': len(templates),
             'templates': templates,
-            'created_at': datetime.now().isoformat(),
+            'created_at': created_at,
             'plr_rights': True,
             'suggested_price': self._calculate_price('email_templates', len(templates)),
             'tags': self._generate_tags(f"email templates {industry}"),
             'formats': ['HTML', 'Plain Text', 'Mailchimp', 'ConvertKit']
         }
         
-        # Save templates
-        filename = f"email_templates_{industry.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        filepath = self.products_dir / filename
-        
-        with open(filepath, 'w') as f:
-            json.dump(email_package, f, indent=2)
+        # Save templates; big collections are serialized off the event loop's process
+        size_hint = sum(len(template['content']) for template in templates)
+        filepath = await self._save_package(f"email_templates_{self._slug(industry)}", email_package, stamp, size_hint)
         
         print(f"✅ Email templates generated: {filepath}")
         return email_package
     
-    def _generate_chapter_content(self, chapter: Dict, topic: str, audience: str) -> str:
+    def _email_template_messages(self, template_type: str, industry: str) -> List[Dict[str, str]]:
+        """
+        Build the chat messages for a single email template
+        """
+        return self._messages(EMAIL_SYSTEM, f"Email type: {template_type}\nIndustry: {industry} businesses")
+    
+    def _chapter_messages(self, chapter: Dict, topic: str, audience: str) -> List[Dict[str, str]]:
+        """
+        Build the chat messages for a single ebook chapter
+        """
+        return self._messages(CHAPTER_SYSTEM, (
+            f'Ebook topic: "{topic}"\n'
+            f"Target audience: {audience}\n"
+            f"Chapter: {chapter.get('title', 'Untitled Chapter')}\n"
+            f"Description: {chapter.get('description', 'No description provided')}"
+        ))
+    
+    async def _generate_chapter_content(self, chapter: Dict, topic: str, audience: str) -> Tuple[str, int]:
+        """
+        Generate detailed content for a chapter, returning the text and its word count
+        """
+        try:
+            content = await self._chat(
+                self.CONTENT_MODEL, self._chapter_messages(chapter, topic, audience),
+                temperature=0.7, max_tokens=self._chapter_max_tokens(chapter)
+            ) or self._chapter_fallback(chapter)
+            
+        except Exception as e:
+            print(f"❌ Error generating chapter content: {e}")
+            content = self._chapter_fallback(chapter)
+        
+        return content, self._word_count(content)
+    
+    @staticmethod
+    def _chapter_max_tokens(chapter: Dict) -> int:
+        """
+        Reply budget for a chapter, from the outline's word target when it gives one
+        """
+        target_words = chapter.get('target_words') or CHAPTER_TARGET_WORDS
+        try:
+            return int(int(target_words) * TOKENS_PER_WORD)
+        except (TypeError, ValueError):
+            return int(CHAPTER_TARGET_WORDS * TOKENS_PER_WORD)
+    
+    @staticmethod
+    def _word_count(text: str) -> int:
+        """
+        Approximate word count from separator counts, without splitting the text
+        """
+        return text.count(' ') + text.count('\n') + 1 if text else 0
+    
+    @staticmethod
+    def _chapter_line(chapter: Dict, content: str) -> bytes:
+        """
+        Serialize one chapter as a line of the ebook's chapters JSONL file
+        """
+        return orjson.dumps({'title': chapter['title'], 'content': content}) + b"\n"
+
+    @staticmethod
+    def _chapter_fallback(chapter: Dict) -> str:
+        return f"Chapter content for {chapter.get('title', 'Untitled')} - [Content generation failed]"
+    
+    @staticmethod
+    def _slug(text: str) -> str:
+        """
+        Turn a topic or type name into a filename fragment
+        """
+        return text.replace(' ', '_').lower()
+    
+    @staticmethod
+    def _now_pair() -> Tuple[str, str]:
+        """
+        Read the clock once for a package's created_at and its filename timestamp
+        """
+        now = datetime.now()
+        return now.isoformat(), now.strftime('%Y%m%d_%H%M%S')
+    
+    def _package_path(self, name: str, stamp: str) -> Path:
+        """
+        Pick an unused timestamped JSON path for a product package
+        """
+        stem = f"{name}_{stamp}"
+        filepath = self.products_dir / f"{stem}.json"
+        
+        # Bulk runs can save several packages with the same name in one second, and
+        # with async writes a concurrent save may not have created its file yet
+        suffix = 1
+        while filepath in self._reserved_paths or filepath.exists() or filepath.with_suffix('.jsonl').exists():
+            suffix += 1
+            filepath = self.products_dir / f"{stem}_{suffix}.json"
+        
+        self._reserved_paths.add(filepath)
+        return filepath
+    
+    async def _save_package(self, name: str, package: Dict[str, Any], stamp: str, size_hint: int = 0) -> Path:
+        """
+        Write a product package to a timestamped JSON file and return its path
+        """
+        filepath = self._package_path(name, stamp)
+        await _dump(package, filepath, size_hint)
+        return filepath
+    
+    async def submit_batch(self, jobs: List[Dict[str, Any]]) -> Dict[str, str]:
+        """
+        Run chat jobs through the OpenAI Batch API and return reply text keyed by custom_id
+        
+        Batches are billed at half price and draw on a separate rate-limit pool,
+        at the cost of latency - results can take up to the 24h completion window.
+        Jobs that fail inside the batch are simply missing from the result.
+        """
+        client = self._client()
+        
+        lines = []
+        for job in jobs:
+            body = {key: value for key, value in job.items() if key not in ('custom_id', 'est_tokens')}
+            lines.append(orjson.dumps({
+                "custom_id": job['custom_id'],
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": body
+            }))
+        
+        batch_file = await client.files.create(
+            file=("batch.jsonl", b"\n".join(lines)),
+            purpose="batch"
+        )
+        batch = await client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        print(f"📦 Submitted batch {batch.id} with {len(jobs)} requests")
+        
+        while batch.status not in ('completed', 'failed', 'expired', 'cancelled'):
+            await asyncio.sleep(BATCH_POLL_INTERVAL)
+            batch = await client.batches.retrieve(batch.id)
+        
+        if batch.status != 'completed':
+            raise RuntimeError(f"Batch {batch.id} ended with status {batch.status}")
+        
+        replies = {}
+        if batch.output_file_id:
+            output = await client.files.content(batch.output_file_id)
+            for line in output.text.splitlines():
+                if not line:
+                    continue
+                result = _loads(line)
+                response = result.get('response') or {}
+                if response.get('status_code') == 200:
+                    replies[result['custom_id']] = response['body']['choices'][0]['message']['content']
+        
+        print(f"✅ Batch {batch.id} completed: {len(replies)}/{len(jobs)} succeeded")
+        return replies
+    
+    @staticmethod
+    def _niche_extras(topic: str) -> Tuple[str, Optional[str]]:
         """
-        Generate detailed content for a chapter
+        Pick the Notion template type and, if the niche suits one, the planner type to pair with an ebook
         """
-        content_prompt = f"""
-        Write a comprehensive chapter for a PLR ebook about "{topic}" targeting {audience}.
+        words = topic.lower().split()
+        tokens = set(words)
         
-        Chapter: {chapter.get('title', 'Untitled Chapter')}
-        Description: {chapter.get('description', 'No description provided')}
+        template_type = "productivity dashboard" if "productivity" in tokens else "planning template"
+        planner_type = words[0] if tokens & PLANNER_TOKENS else None
+        
+        return template_type, planner_type
+    
+    async def generate_niche(self, topic: str, audience: str) -> List[Dict[str, Any]]:
+        """
+        Generate an ebook plus its companion Notion template and planner, all concurrently
+        """
+        print(f"\n📚 Generating products for: {topic}")
         
-        Requirements:
-        - 800-1200 words
-        - Actionable advice
-        - Professional tone
-        - Include examples
-        - Add bullet points and subheadings
-        - End with key takeaways
+        template_type, planner_type = self._niche_extras(topic)
+        jobs = [
+            self.generate_ebook_async(topic, audience),
+            self.generate_notion_template_async(template_type, topic)
+        ]
+        if planner_type:
+            jobs.append(self.generate_planner_template_async(planner_type, "monthly"))
         
-        Make it valuable and engaging.
+        products = [product for product in await asyncio.gather(*jobs) if product]
+        print(f"✅ Products generated for {topic}")
+        return products
+    
+    async def generate_bulk(self, niches: List[tuple]) -> List[Dict[str, Any]]:
         """
+        Generate ebooks, Notion templates and planners for many niches via the Batch API
         
-        try:
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": content_prompt}],
-                temperature=0.7,
-                max_tokens=1500
-            )
+        Runs two batches: outlines plus the standalone templates first, then every
+        chapter and description once the outlines are known.
+        """
+        print(f"🚀 Bulk generating products for {len(niches)} niches")
+        
+        extras = [self._niche_extras(topic) for topic, _ in niches]
+        
+        first_round = []
+        planners = {}
+        for i, (topic, audience) in enumerate(niches):
+            template_type, planner_type = extras[i]
+            first_round.append({"custom_id": f"outline:{i}", **self._job(
+                self.OUTLINE_MODEL, self._outline_messages(topic, audience),
+                temperature=0.7, max_tokens=STRUCTURED_MAX_TOKENS, response_format=JSON_OBJECT
+            )})
+            first_round.append({"custom_id": f"notion:{i}", **self._job(
+                self.OUTLINE_MODEL, self._notion_messages(template_type, topic),
+                temperature=0.6, max_tokens=STRUCTURED_MAX_TOKENS, response_format=JSON_OBJECT
+            )})
             
-            return response.choices[0].message.content
+            if planner_type:
+                planners[i] = planner_type
+                first_round.append({"custom_id": f"planner:{i}", **self._job(
+                    self.OUTLINE_MODEL, self._planner_messages(planners[i], "monthly"),
+                    temperature=0.6, max_tokens=STRUCTURED_MAX_TOKENS, response_format=JSON_OBJECT
+                )})
+        
+        replies = await self.submit_batch(first_round)
+        
+        packages = []
+        outlines = {}
+        created_at, stamp = self._now_pair()
+        for i, (topic, audience) in enumerate(niches):
+            template_type = extras[i][0]
+            try:
+                outlines[i] = _loads(replies[f"outline:{i}"])
+            except (KeyError, ValueError) as e:
+                print(f"❌ Error generating ebook outline for {topic}: {e}")
             
-        except Exception as e:
-            print(f"❌ Error generating chapter content: {e}")
-            return f"Chapter content for {chapter.get('title', 'Untitled')} - [Content generation failed]"
+            try:
+                template_package = self._notion_package(template_type, topic, _loads(replies[f"notion:{i}"]), created_at)
+                filepath = await self._save_package(f"notion_{self._slug(template_type)}", template_package, stamp)
+                print(f"✅ Notion template generated: {filepath}")
+                packages.append(template_package)
+            except (KeyError, ValueError) as e:
+                print(f"❌ Error generating Notion template for {topic}: {e}")
+            
+            if i in planners:
+                try:
+                    planner_package = self._planner_package(planners[i], "monthly", _loads(replies[f"planner:{i}"]), created_at)
+                    filepath = await self._save_package(f"planner_{self._slug(planners[i])}_monthly", planner_package, stamp)
+                    print(f"✅ Planner generated: {filepath}")
+                    packages.append(planner_package)
+                except (KeyError, ValueError) as e:
+                    print(f"❌ Error generating planner for {topic}: {e}")
+        
+        second_round = []
+        for i, outline in outlines.items():
+            topic, audience = niches[i]
+            for j, chapter in enumerate(outline['chapters']):
+                second_round.append({"custom_id": f"chapter:{i}:{j}", **self._job(
+                    self.CONTENT_MODEL, self._chapter_messages(chapter, topic, audience),
+                    temperature=0.7, max_tokens=self._chapter_max_tokens(chapter)
+                )})
+            second_round.append({"custom_id": f"description:{i}", **self._job(
+                self.CONTENT_MODEL, self._description_messages(outline['title'], topic), temperature=0.8, max_tokens=300
+            )})
+        
+        replies = await self.submit_batch(second_round) if second_round else {}
+        
+        created_at, stamp = self._now_pair()
+        for i, outline in outlines.items():
+            topic, audience = niches[i]
+            filepath = self._package_path(f"ebook_{self._slug(topic)}", stamp)
+            chapters_path = filepath.with_suffix('.jsonl')
+            total_words = 0
+            
+            async with aiofiles.open(chapters_path, 'wb') as f:
+                for j, chapter in enumerate(outline['chapters']):
+                    content = replies.pop(f"chapter:{i}:{j}", None) or self._chapter_fallback(chapter)
+                    await f.write(self._chapter_line(chapter, content))
+                    total_words += self._word_count(content)
+            
+            description = replies.get(f"description:{i}") or self._description_fallback(topic)
+            ebook_package = self._ebook_package(topic, audience, outline, chapters_path, total_words, description, created_at)
+            await _dump(ebook_package, filepath)
+            print(f"✅ Ebook generated: {filepath}")
+            packages.append(ebook_package)
+        
+        return packages
     
     def _calculate_price(self, product_type: str, quantity: int) -> int:
         """
@@ -346,88 +871,61 @@ class AIProductGenerator:
         """
         Generate relevant tags for SEO and categorization
         """
-        tag_categories = {
-            'business': ['business', 'entrepreneur', 'startup', 'marketing', 'sales'],
-            'productivity': ['productivity', 'organization', 'planning', 'efficiency', 'workflow'],
-            'health': ['health', 'wellness', 'fitness', 'nutrition', 'lifestyle'],
-            'finance': ['finance', 'money', 'investing', 'budgeting', 'wealth'],
-            'social media': ['social media', 'content', 'instagram', 'tiktok', 'marketing'],
-            'real estate': ['real estate', 'property', 'investing', 'landlord', 'rental']
+        # One scan for every category word; a category matches if any of its words appears
+        matched = {
+            category
+            for match in TAG_WORD_RE.finditer(content)
+            for category in TAG_WORD_CATEGORIES[match.group(0).lower()]
         }
         
-        content_lower = content.lower()
         tags = []
-        
-        for category, category_tags in tag_categories.items():
-            if any(word in content_lower for word in category.split()):
+        for category, category_tags in TAG_CATEGORIES.items():
+            if category in matched:
                 tags.extend(category_tags[:3])  # Add first 3 tags from matching category
         
         # Add generic tags
-        tags.extend(['PLR', 'MRR', 'digital product', 'template', 'instant download'])
+        tags.extend(GENERIC_TAGS)
         
-        return list(set(tags))[:10]  # Return unique tags, max 10
+        return list(dict.fromkeys(tags))[:10]  # Return unique tags in order, max 10
     
-    def _generate_description(self, title: str, topic: str) -> str:
+    def _description_messages(self, title: str, topic: str) -> List[Dict[str, str]]:
         """
-        Generate product description for marketplace listing
+        Build the chat messages for a marketplace product description
         """
-        description_prompt = f"""
-        Write a compelling product description for a PLR digital product:
-        
-        Title: {title}
-        Topic: {topic}
-        
-        Include:
-        - Hook that grabs attention
-        - Key benefits and features
-        - What's included in the package
-        - PLR/MRR rights explanation
-        - Call-to-action
-        
-        Keep it under 200 words, sales-focused, and professional.
+        return self._messages(DESCRIPTION_SYSTEM, f"Title: {title}\nTopic: {topic}")
+    
+    async def _generate_description(self, title: str, topic: str) -> str:
+        """
+        Generate product description for marketplace listing
         """
-        
         try:
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": description_prompt}],
-                temperature=0.8,
-                max_tokens=300
-            )
-            
-            return response.choices[0].message.content
-            
+            return await self._chat(self.CONTENT_MODEL, self._description_messages(title, topic), temperature=0.8, max_tokens=300)
+        
         except Exception as e:
             print(f"❌ Error generating description: {e}")
-            return f"Professional PLR digital product about {topic}. Includes full resell rights and ready-to-use content."
+            return self._description_fallback(topic)
+    
+    @staticmethod
+    def _description_fallback(topic: str) -> str:
+        return f"Professional PLR digital product about {topic}. Includes full resell rights and ready-to-use content."
     
     def _extract_subject_line(self, email_content: str) -> str:
         """
         Extract subject line from email template
         """
-        lines = email_content.split('\n')
-        for line in lines:
-            if 'subject' in line.lower() and ':' in line:
-                return line.split(':', 1)[1].strip()
-        return "[Subject Line Not Found]"
+        match = SUBJ_RE.search(email_content)
+        return match.group(1).strip() if match else "[Subject Line Not Found]"
     
     def _extract_cta(self, email_content: str) -> str:
         """
         Extract call-to-action from email template
         """
-        # Simple extraction - look for common CTA patterns
-        cta_patterns = ['click here', 'get started', 'buy now', 'learn more', 'sign up']
-        lines = email_content.lower().split('\n')
-        
-        for line in lines:
-            for pattern in cta_patterns:
-                if pattern in line:
-                    return line.strip()
-        
-        return "Get Started Today"
+        # Simple extraction - first line containing a common CTA phrase
+        match = CTA_RE.search(email_content)
+        return match.group(0).strip() if match else "Get Started Today"
 
 # Usage examples and batch generation
-def main():
+async def main(batch: bool = False):
     """
     Demo the AI Product Generator
     """
@@ -444,24 +942,23 @@ def main():
     
     print("🚀 Starting AI Product Generation...")
     
-    for topic, audience in profitable_niches:
-        print(f"\n📚 Generating products for: {topic}")
-        
-        # Generate ebook
-        ebook = generator.generate_ebook(topic, audience)
-        
-        # Generate related Notion template
-        template_type = "productivity dashboard" if "productivity" in topic.lower() else "planning template"
-        notion_template = generator.generate_notion_template(template_type, topic)
-        
-        # Generate planner if applicable
-        if any(word in topic.lower() for word in ['finance', 'wellness', 'productivity']):
-            planner = generator.generate_planner_template(topic.split()[0].lower(), "monthly")
-        
-        print(f"✅ Products generated for {topic}")
+    try:
+        if batch:
+            # One batched submission for every niche: half the cost, but results can take hours
+            packages = await generator.generate_bulk(profitable_niches)
+        else:
+            # Every niche at once; the generator's rate limiter keeps this within API limits
+            niche_products = await asyncio.gather(
+                *[generator.generate_niche(topic, audience) for topic, audience in profitable_niches]
+            )
+            packages = [product for products in niche_products for product in products]
+    finally:
+        await generator.aclose()
     
-    print("\n🎉 All products generated successfully!")
+    print(f"\n🎉 {len(packages)} products generated successfully!")
     print(f"📁 Check the '{generator.products_dir}' folder for your products")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Generate PLR/MRR products for the demo niches")
+    parser.add_argument('--batch', action='store_true', help="use the OpenAI Batch API (half price, slower)")
+    asyncio.run(main(parser.parse_args().batch))
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+LLM Response Cache - Local SQLite store for repeatable chat completions
+Part of Nosyt WHOP Automation System
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import orjson
+
+# Only near-deterministic requests are worth replaying from cache
+MAX_CACHED_TEMPERATURE = float(os.getenv('LLM_CACHE_MAX_TEMPERATURE', 0.3))
+
+def cache_key(job: Dict[str, Any]) -> str:
+    """
+    Hash the parts of a chat job that determine its reply
+    """
+    payload = {
+        "m": job['model'],
+        "msgs": job['messages'],
+        "t": job.get('temperature'),
+        "mt": job.get('max_tokens'),
+        "rf": job.get('response_format')
+    }
+    return hashlib.sha256(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+def is_cacheable(job: Dict[str, Any]) -> bool:
+    """
+    Whether a job is deterministic enough that replaying a stored reply is safe
+    """
+    return job.get('temperature', 1.0) <= MAX_CACHED_TEMPERATURE
+
+class SqliteCache:
+    """
+    Reply text keyed by request hash, persisted across runs
+    """
+    
+    def __init__(self, path: str = "cache/llm.sqlite"):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        
+        with self._lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT, created_at REAL)"
+            )
+    
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+    
+    def set(self, key: str, value: str):
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at) VALUES (?, ?, ?)",
+                (key, value, time.time())
+            )
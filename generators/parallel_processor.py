@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Parallel Request Processor - Rate-limited concurrent OpenAI chat requests
+Part of Nosyt WHOP Automation System
+
+Modeled on the openai-cookbook api_request_parallel_processor script: a
+dispatcher only starts a request once both the requests-per-minute and
+tokens-per-minute budgets have room for it, and rate-limited or transient
+failures are retried with backoff instead of being dropped.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Dict, List, Union
+
+import openai
+
+# Errors worth retrying; anything else fails the job immediately
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError
+)
+
+# Seconds to stop dispatching after the API reports a rate limit
+RATE_LIMIT_COOLDOWN = 15
+
+class RateLimiter:
+    """
+    Request and token budgets that refill continuously, shared by all in-flight jobs
+    """
+    
+    def __init__(self, rpm: float, tpm: float):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.request_capacity = rpm
+        self.token_capacity = tpm
+        self.last_update = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()  # Generators may run event loops on several threads
+    
+    @classmethod
+    def from_env(cls) -> 'RateLimiter':
+        """
+        Build a limiter from the OPENAI_RPM / OPENAI_TPM environment settings
+        """
+        return cls(float(os.getenv('OPENAI_RPM', 500)), float(os.getenv('OPENAI_TPM', 90000)))
+    
+    def _try_take(self, tokens: float) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self.last_update
+            self.request_capacity = min(self.rpm, self.request_capacity + self.rpm * elapsed / 60)
+            self.token_capacity = min(self.tpm, self.token_capacity + self.tpm * elapsed / 60)
+            self.last_update = now
+            
+            if now < self.paused_until or self.request_capacity < 1 or self.token_capacity < tokens:
+                return False
+            
+            self.request_capacity -= 1
+            self.token_capacity -= tokens
+            return True
+    
+    async def acquire(self, tokens: float):
+        """
+        Wait until one request and the given number of tokens are available
+        """
+        tokens = min(tokens, self.tpm)  # An oversized job must still be able to run
+        while not self._try_take(tokens):
+            await asyncio.sleep(0.05)
+    
+    def pause(self, seconds: float):
+        """
+        Hold off all dispatching for a while, e.g. after a 429
+        """
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+def estimate_tokens(job: Dict[str, Any]) -> int:
+    """
+    Rough token cost of a chat job: ~4 characters per prompt token plus the reply budget
+    """
+    prompt_chars = sum(len(message['content']) for message in job['messages'])
+    return prompt_chars // 4 + job.get('max_tokens', 1000)
+
+async def run_requests(client, jobs: List[Dict[str, Any]], limiter: RateLimiter,
+                       max_attempts: int = 5) -> List[Union[str, Exception]]:
+    """
+    Run chat-completion jobs concurrently within the limiter's budget
+    
+    Each job holds chat.completions.create parameters plus an optional
+    'est_tokens' cost. Returns the reply text for each job, in order, or the
+    exception that made it give up.
+    """
+    results: List[Union[str, Exception, None]] = [None] * len(jobs)
+    pending: asyncio.Queue = asyncio.Queue()
+    in_flight = set()
+    
+    for index, job in enumerate(jobs):
+        pending.put_nowait((index, job, 1))
+    
+    async def call(index: int, job: Dict[str, Any], attempt: int):
+        params = {key: value for key, value in job.items() if key != 'est_tokens'}
+        try:
+            response = await client.chat.completions.create(**params)
+            results[index] = response.choices[0].message.content
+        except RETRYABLE_ERRORS as e:
+            if isinstance(e, openai.RateLimitError):
+                limiter.pause(RATE_LIMIT_COOLDOWN)
+            
+            if attempt < max_attempts:
+                await asyncio.sleep(min(2 ** attempt, 30))
+                pending.put_nowait((index, job, attempt + 1))
+            else:
+                results[index] = e
+        except Exception as e:
+            results[index] = e
+    
+    while True:
+        if pending.empty():
+            if not in_flight:
+                break
+            await asyncio.wait(set(in_flight), return_when=asyncio.FIRST_COMPLETED)
+            continue
+        
+        index, job, attempt = pending.get_nowait()
+        await limiter.acquire(job.get('est_tokens') or estimate_tokens(job))
+        
+        task = asyncio.create_task(call(index, job, attempt))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+    
+    return results
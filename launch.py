@@ -6,13 +6,55 @@ Nosyt WHOP Automation System
 
 import os
 import sys
-import json
+import hashlib
+import re
 import subprocess
 from pathlib import Path
-import time
+from importlib.metadata import PackageNotFoundError, requires, version
+
+# Hash of the requirements last installed successfully into this interpreter
+DEPS_MARKER = Path('config/.deps.sha')
+
+# Working directories the automation writes into
+DIRS = ('generated_products', 'output', 'logs', 'reports', 'config', 'cache')
+
+# Written out when requirements.txt is missing
+REQUIREMENTS_TEXT = """
+openai>=1.0.0
+requests>=2.28.0
+numpy>=1.21.0
+pandas>=1.3.0
+fastapi>=0.95.0
+uvicorn>=0.20.0
+python-dotenv>=1.0.0
+aiofiles>=23.0.0
+orjson>=3.8.0
+jinja2>=3.1.0
+aiohttp>=3.8.0
+httpx[http2]>=0.24.0
+tiktoken>=0.5.0
+packaging>=22.0
+"""
+
+class _Log:
+    """Collect status lines and write them to stdout in one go per phase"""
+    
+    def __init__(self):
+        self.buf = []
+    
+    def __call__(self, *args):
+        self.buf.append(" ".join(map(str, args)))
+    
+    def flush(self):
+        if self.buf:
+            sys.stdout.write("\n".join(self.buf) + "\n")
+            sys.stdout.flush()
+            self.buf.clear()
+
+log = _Log()
 
 def print_banner():
-    print("""
+    log("""
 ██████╗ ██████╗ ███████╗██╗   ██╗███████╗
 ██╔══██╗██╔══██╗██╔════╝╚██╗ ██╔╝██╔════╝
 ██████╔╝██║  ██║█████╗   ╚████╔╝ █████╗  
@@ -28,76 +70,133 @@ def print_banner():
 def check_python_version():
     """Check if Python version is compatible"""
     if sys.version_info < (3, 8):
-        print("❌ Python 3.8 or higher is required")
-        print(f"Current version: {sys.version}")
+        log("❌ Python 3.8 or higher is required")
+        log(f"Current version: {sys.version}")
+        log.flush()
         sys.exit(1)
-    print(f"✅ Python {sys.version.split()[0]} - Compatible")
+    log(f"✅ Python {sys.version.split()[0]} - Compatible")
 
 def setup_environment():
     """Setup the virtual environment and install dependencies"""
-    print("\n🛠  Setting up environment...")
+    log("\n🛠  Setting up environment...")
     
     # Create directories if they don't exist
-    directories = [
-        'generated_products',
-        'output',
-        'logs',
-        'reports',
-        'config'
-    ]
-    
-    for directory in directories:
+    for directory in DIRS:
         Path(directory).mkdir(exist_ok=True)
-        print(f"✅ Created directory: {directory}")
+    log(f"✅ Created directories: {', '.join(DIRS)}")
     
     # Create requirements.txt if it doesn't exist
     requirements_file = Path('requirements.txt')
     if not requirements_file.exists():
-        requirements = """
-openai>=1.0.0
-requests>=2.28.0
-schedule>=1.2.0
-numpy>=1.21.0
-pandas>=1.3.0
-fastapi>=0.95.0
-uvicorn>=0.20.0
-python-dotenv>=1.0.0
-aiofiles>=23.0.0
-jinja2>=3.1.0
-"""
-        with open(requirements_file, 'w') as f:
-            f.write(requirements)
-        print("✅ Created requirements.txt")
+        requirements_file.write_text(REQUIREMENTS_TEXT)
+        log("✅ Created requirements.txt")
     
     # Install dependencies
-    print("\n📦 Installing dependencies...")
+    install_dependencies(requirements_file)
+
+def install_dependencies(requirements_file: Path):
+    """Install only the requirements this interpreter is missing"""
+    requirements = requirements_file.read_bytes()
+    deps_sha = hashlib.sha256(requirements + sys.executable.encode()).hexdigest()
+    
+    if DEPS_MARKER.exists() and DEPS_MARKER.read_text(errors='ignore').strip() == deps_sha:
+        log("✅ Dependencies unchanged since last install")
+        return
+    
+    missing = missing_requirements(requirements.decode().splitlines())
+    if missing:
+        log(f"\n📦 Installing {len(missing)} missing dependencies: {', '.join(missing)}")
+        log.flush()  # pip writes straight to the terminal
+        try:
+            subprocess.run([sys.executable, '-m', 'pip', 'install', '--disable-pip-version-check', '-q', *missing],
+                          check=True)
+        except subprocess.CalledProcessError as e:
+            log(f"⚠️  Warning: Some dependencies might not have installed correctly")
+            log(f"Error: {e}")
+            return
+    
+    DEPS_MARKER.write_text(deps_sha)
+    log("✅ Dependencies installed successfully")
+
+def missing_requirements(lines):
+    """Return the requirement lines that are not installed at a satisfying version"""
+    try:
+        from packaging.requirements import InvalidRequirement, Requirement
+    except ImportError:
+        Requirement = None  # Without a parser only bare names can be confirmed as installed
+    
+    missing = []
+    for line in lines:
+        spec = line.split('#', 1)[0].strip()
+        if not spec or spec.startswith('-'):
+            continue  # Blank lines and pip options (-r, -e, --index-url) name no package
+        
+        requirement = None
+        if Requirement:
+            try:
+                requirement = Requirement(spec)
+            except InvalidRequirement:
+                pass  # Bare URLs and paths keep the presence-only check
+        
+        if requirement is None:
+            # Anything beyond a bare name (versions, extras, markers, URLs) is left to pip
+            satisfied = bool(re.fullmatch(r'[A-Za-z0-9._-]+', spec)) and _installed_version(spec) is not None
+        else:
+            satisfied = _requirement_satisfied(requirement, Requirement)
+        
+        if not satisfied:
+            missing.append(spec)
+    
+    return missing
+
+def _installed_version(name):
+    """Return the installed version of a distribution, or None when it is absent"""
     try:
-        subprocess.run([sys.executable, '-m', 'pip', 'install', '-r', 'requirements.txt'], 
-                      check=True, capture_output=True)
-        print("✅ Dependencies installed successfully")
-    except subprocess.CalledProcessError as e:
-        print(f"⚠️  Warning: Some dependencies might not have installed correctly")
-        print(f"Error: {e}")
+        return version(name)
+    except PackageNotFoundError:
+        return None
+
+def _requirement_satisfied(requirement, parse) -> bool:
+    """Check a parsed requirement's version and the dependencies each of its extras pulls in"""
+    if requirement.marker and not requirement.marker.evaluate():
+        return True  # Not meant for this interpreter or platform
+    
+    installed = _installed_version(requirement.name)
+    if installed is None or not requirement.specifier.contains(installed, prereleases=True):
+        return False
+    
+    # httpx[http2] only works with h2 installed, so extras count as part of the requirement
+    for extra in requirement.extras:
+        for line in requires(requirement.name) or ():
+            dependency = parse(line)
+            marker = dependency.marker
+            if marker and marker.evaluate({'extra': extra}) and not marker.evaluate({'extra': ''}):
+                dependency.marker = None  # Already evaluated for this extra
+                if not _requirement_satisfied(dependency, parse):
+                    return False
+    
+    return True
 
 def create_env_file():
     """Create .env file with user configuration"""
-    print("\n🔑 Setting up API credentials...")
+    log("\n🔑 Setting up API credentials...")
     
     env_file = Path('.env')
     
     # Check if .env already exists
     if env_file.exists():
-        print("✅ Found existing .env file")
+        log("✅ Found existing .env file")
         with open(env_file, 'r') as f:
             content = f.read()
             if 'WHOP_API_KEY' in content and 'OPENAI_API_KEY' in content:
-                print("✅ API keys already configured")
+                log("✅ API keys already configured")
                 return
     
-    print("\n🔑 Please provide your API credentials:")
-    print("(You can always update these later in the .env file)")
+    log("\n🔑 Please provide your API credentials:")
+    log("(You can always update these later in the .env file)")
     
     # Get API keys from user
+    log.flush()
     openai_key = input("\nOpenAI API Key (for AI generation): ").strip()
     whop_api_key = input("WHOP API Key (get from https://dev.whop.com): ").strip()
     whop_company_id = input("WHOP Company ID: ").strip()
@@ -125,147 +224,159 @@ DEBUG=false
     with open(env_file, 'w') as f:
         f.write(env_content)
     
-    print("✅ Created .env file with your API keys")
-    print("⚠️  Keep your .env file secure and never share it publicly!")
+    log("✅ Created .env file with your API keys")
+    log("⚠️  Keep your .env file secure and never share it publicly!")
 
 def quick_test():
     """Run a quick test to ensure everything is working"""
-    print("\n🧪 Running quick test...")
+    log("\n🧪 Running quick test...")
     
     try:
         # Test OpenAI import
         import openai
-        print("✅ OpenAI library imported")
+        log("✅ OpenAI library imported")
         
         # Test requests import
         import requests
-        print("✅ Requests library imported")
+        log("✅ Requests library imported")
         
         # Test our modules
         sys.path.append('.')
         from generators.ai_product_generator import AIProductGenerator
         from whop_api.whop_integration import WhopIntegration
-        print("✅ Custom modules imported")
+        log("✅ Custom modules imported")
         
         # Test API key loading
         from dotenv import load_dotenv
         load_dotenv()
         
         if os.getenv('OPENAI_API_KEY'):
-            print("✅ OpenAI API key loaded")
+            log("✅ OpenAI API key loaded")
         else:
-            print("⚠️  OpenAI API key not found in environment")
+            log("⚠️  OpenAI API key not found in environment")
         
         if os.getenv('WHOP_API_KEY'):
-            print("✅ WHOP API key loaded")
+            log("✅ WHOP API key loaded")
         else:
-            print("⚠️  WHOP API key not found in environment")
+            log("⚠️  WHOP API key not found in environment")
         
-        print("✅ System test passed!")
+        log("✅ System test passed!")
         return True
         
     except ImportError as e:
-        print(f"❌ Import error: {e}")
+        log(f"❌ Import error: {e}")
         return False
     except Exception as e:
-        print(f"❌ Test failed: {e}")
+        log(f"❌ Test failed: {e}")
         return False
 
 def show_next_steps():
     """Show user what to do next"""
-    print("\n" + "=" * 60)
-    print("🎉 SETUP COMPLETE! Your WHOP automation system is ready!")
-    print("=" * 60)
-    
-    print("\n🚀 QUICK START OPTIONS:")
-    print("\n1. 📚 Generate your first products:")
-    print("   python automation/auto_launcher.py")
-    print("   Choose option 1 to generate and upload products immediately")
-    
-    print("\n2. 🔄 Start 24/7 automation:")
-    print("   python automation/auto_launcher.py")
-    print("   Choose option 2 to run continuous automation")
-    
-    print("\n3. 📊 View web dashboard:")
-    print("   Open web/dashboard.html in your browser")
-    print("   Monitor your earnings and system status")
-    
-    print("\n💰 PROFIT TARGETS:")
-    print("   Week 1-2: $500-1,500/month (PLR reselling)")
-    print("   Week 3-4: $1,500-5,000/month (AI products)")
-    print("   Month 2+: $5,000-15,000+/month (memberships)")
-    
-    print("\n🔧 CONFIGURATION:")
-    print("   - Edit config/automation_config.json for settings")
-    print("   - Update .env file with API keys if needed")
-    print("   - Check logs/ folder for system activity")
-    
-    print("\n🎯 TOP PERFORMING NICHES (Based on WHOP data):")
+    log("\n" + "=" * 60)
+    log("🎉 SETUP COMPLETE! Your WHOP automation system is ready!")
+    log("=" * 60)
+    
+    log("\n🚀 QUICK START OPTIONS:")
+    log("\n1. 📚 Generate your first products:")
+    log("   python automation/auto_launcher.py")
+    log("   Choose option 1 to generate and upload products immediately")
+    
+    log("\n2. 🔄 Start 24/7 automation:")
+    log("   python automation/auto_launcher.py")
+    log("   Choose option 2 to run continuous automation")
+    
+    log("\n3. 📊 View web dashboard:")
+    log("   Open web/dashboard.html in your browser")
+    log("   Monitor your earnings and system status")
+    
+    log("\n💰 PROFIT TARGETS:")
+    log("   Week 1-2: $500-1,500/month (PLR reselling)")
+    log("   Week 3-4: $1,500-5,000/month (AI products)")
+    log("   Month 2+: $5,000-15,000+/month (memberships)")
+    
+    log("\n🔧 CONFIGURATION:")
+    log("   - Edit config/automation_config.json for settings")
+    log("   - Update .env file with API keys if needed")
+    log("   - Check logs/ folder for system activity")
+    
+    log("\n🎯 TOP PERFORMING NICHES (Based on WHOP data):")
     niches = [
         "Social Media Marketing", "Personal Finance", "Productivity",
         "Real Estate Investment", "Dropshipping", "Email Marketing",
         "Cryptocurrency", "Affiliate Marketing", "Wellness", "Time Management"
     ]
     for i, niche in enumerate(niches, 1):
-        print(f"   {i:2d}. {niche}")
+        log(f"   {i:2d}. {niche}")
     
-    print("\n📧 SUPPORT:")
-    print("   - Documentation: ./docs/ folder")
-    print("   - GitHub Issues: For bug reports")
-    print("   - Email: support@nosyt.com")
+    log("\n📧 SUPPORT:")
+    log("   - Documentation: ./docs/ folder")
+    log("   - GitHub Issues: For bug reports")
+    log("   - Email: support@nosyt.com")
     
-    print("\n" + "=" * 60)
-    print("🚀 Ready to build your digital product empire!")
-    print("=" * 60)
+    log("\n" + "=" * 60)
+    log("🚀 Ready to build your digital product empire!")
+    log("=" * 60)
 
 def main():
     """Main launcher function"""
     print_banner()
     
     # Step 1: Check Python version
-    print("🔍 Step 1: Checking Python version...")
+    log("🔍 Step 1: Checking Python version...")
     check_python_version()
+    log.flush()
     
     # Step 2: Setup environment
-    print("\n🛠  Step 2: Setting up environment...")
+    log("\n🛠  Step 2: Setting up environment...")
     setup_environment()
+    log.flush()
     
     # Step 3: Create .env file
-    print("\n🔑 Step 3: Configuring API credentials...")
+    log("\n🔑 Step 3: Configuring API credentials...")
     create_env_file()
+    log.flush()
     
     # Step 4: Quick test
-    print("\n🧪 Step 4: Testing system...")
+    log("\n🧪 Step 4: Testing system...")
     if not quick_test():
-        print("❌ Setup incomplete. Please check the errors above.")
+        log("❌ Setup incomplete. Please check the errors above.")
+        log.flush()
         return
+    log.flush()
     
     # Step 5: Show next steps
     show_next_steps()
     
     # Ask user what they want to do
-    print("\n\nWhat would you like to do now?")
-    print("1. Generate products immediately")
-    print("2. Start continuous automation")
-    print("3. Exit and configure manually")
+    log("\n\nWhat would you like to do now?")
+    log("1. Generate products immediately")
+    log("2. Start continuous automation")
+    log("3. Exit and configure manually")
     
+    log.flush()
     choice = input("\nEnter choice (1-3): ").strip()
     
     if choice == '1':
-        print("\n🚀 Starting product generation...")
+        log("\n🚀 Starting product generation...")
+        log.flush()
         try:
             subprocess.run([sys.executable, 'automation/auto_launcher.py'], input='1\n', text=True)
         except KeyboardInterrupt:
-            print("\n🛑 Stopped by user")
+            log("\n🛑 Stopped by user")
     elif choice == '2':
-        print("\n🔄 Starting continuous automation...")
-        print("Press Ctrl+C to stop")
+        log("\n🔄 Starting continuous automation...")
+        log("Press Ctrl+C to stop")
+        log.flush()
         try:
             subprocess.run([sys.executable, 'automation/auto_launcher.py'], input='2\n', text=True)
         except KeyboardInterrupt:
-            print("\n🛑 Automation stopped")
+            log("\n🛑 Automation stopped")
     else:
-        print("\n👍 Setup complete! Run the commands above when ready.")
+        log("\n👍 Setup complete! Run the commands above when ready.")
+    log.flush()
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        log.flush()  # Don't lose buffered lines if a phase raises
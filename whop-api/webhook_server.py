@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+WHOP Webhook Server - Keeps the local product index current from WHOP events
+Part of Nosyt WHOP Automation System
+"""
+
+import hmac
+import logging
+import os
+import threading
+from typing import Dict, Any, Optional
+
+import uvicorn
+from fastapi import Body, FastAPI, HTTPException, Query
+
+if __package__:
+    from .whop_integration import WhopWebhookHandler
+else:
+    from whop_integration import WhopWebhookHandler
+
+# Shares the queued "whop" logger configured in whop_integration
+logger = logging.getLogger("whop")
+
+# Path WHOP posts events to; register WEBHOOK_URL ending in it
+WEBHOOK_PATH = '/webhook/whop'
+
+def create_app(index: WhopWebhookHandler, secret: Optional[str] = None) -> FastAPI:
+    """
+    FastAPI app that applies every posted WHOP event to the product index
+    
+    When a secret is set (WHOP_WEBHOOK_SECRET by default), requests must carry it
+    as ?token=..., which setup_webhooks appends to the registered URL.
+    """
+    secret = secret if secret is not None else os.getenv('WHOP_WEBHOOK_SECRET', '')
+    app = FastAPI(title="Nosyt WHOP webhooks")
+    
+    # A plain def runs in FastAPI's thread pool, keeping the sqlite write off the event loop
+    @app.post(WEBHOOK_PATH)
+    def whop_webhook(event: Dict[str, Any] = Body(...), token: str = Query('')):
+        if secret and not hmac.compare_digest(token.encode(), secret.encode()):
+            raise HTTPException(status_code=403, detail="Invalid webhook token")
+        
+        return {'changed': index.handle_event(event)}
+    
+    return app
+
+def serve_in_background(index: WhopWebhookHandler, port: int, host: str = '0.0.0.0') -> threading.Thread:
+    """
+    Serve the webhook app on a daemon thread alongside the automation schedules
+    """
+    server = uvicorn.Server(uvicorn.Config(create_app(index), host=host, port=port, log_level='warning'))
+    thread = threading.Thread(target=server.run, name='whop-webhooks', daemon=True)
+    thread.start()
+    
+    logger.info("🔗 Listening for WHOP webhooks on %s:%s%s", host, port, WEBHOOK_PATH)
+    return thread
@@ -4,16 +4,302 @@ WHOP API Integration - Automated product upload and management
 Part of Nosyt WHOP Automation System
 """
 
-import requests
-import json
+import atexit
+import gzip
+import hashlib
+import httpx
+import importlib.util
+import io
+import logging
+import orjson
+import mmap
 import os
-from typing import Dict, List, Any, Optional
+import random
+import queue
+import sqlite3
+import sys
+import threading
+import weakref
+from typing import Dict, List, Any, Optional, Iterator, Tuple
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import OrderedDict
 from pathlib import Path
+from types import MappingProxyType
+import aiofiles
+from jinja2 import Environment
+
+logger = logging.getLogger("whop")
+
+# Background thread that writes queued "whop" log records; started with the first client
+_log_listener: Optional[QueueListener] = None
+_log_listener_lock = threading.Lock()
+
+def _start_log_listener():
+    """
+    Hand "whop" status output to a background thread so upload workers never block on the console
+    """
+    global _log_listener
+    with _log_listener_lock:
+        if _log_listener is not None:
+            return
+        
+        log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+        logger.addHandler(QueueHandler(log_queue))
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        
+        _log_listener = QueueListener(log_queue, logging.StreamHandler(sys.stdout))
+        _log_listener.start()
+        atexit.register(_log_listener.stop)
+
+# HTTP/2 multiplexes concurrent uploads over one connection; needs the optional h2 package
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+# Throttled and transient statuses worth retrying, and the methods safe to replay;
+# POST is left out so a retried create can never publish the same product twice
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+RETRY_METHODS = frozenset({"GET", "PATCH"})
+MAX_RETRIES = 5
+
+# JSON bodies larger than this are gzipped; level 1 keeps compression cheap next to the upload
+GZIP_MIN_BYTES = 1024
+
+# Failures of a single API call that are reported and returned as None/False;
+# anything else is a bug and propagates
+API_ERRORS = (httpx.HTTPError, orjson.JSONDecodeError)
+
+# WHOP marketplace category for each of our product types
+_CATEGORY_MAPPING = MappingProxyType({
+    'ebook': 'education',
+    'notion_template': 'productivity',
+    'digital_planner': 'productivity',
+    'email_templates': 'marketing',
+    'course': 'education',
+    'membership': 'community'
+})
+
+# Type-specific WHOP metadata, built from our product data
+_TYPE_META = MappingProxyType({
+    'ebook': lambda data: {
+        "chapters": data.get('chapter_count', len(data.get('chapters', []))),
+        "formats": ["PDF", "EPUB", "DOCX"]
+    },
+    'notion_template': lambda data: {
+        "template_type": data.get('template_type'),
+        "use_case": data.get('use_case')
+    },
+    'digital_planner': lambda data: {
+        "planner_type": data.get('planner_type'),
+        "period": data.get('period'),
+        "formats": data.get('formats', [])
+    }
+})
+
+# Compiled once; autoescaping keeps generated titles and chapter text from injecting markup
+_EBOOK_HTML = Environment(autoescape=True).from_string("""
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{{ title }}</title>
+    <style>
+        body { font-family: Georgia, serif; line-height: 1.6; max-width: 800px; margin: 0 auto; padding: 20px; }
+        h1 { color: #333; border-bottom: 3px solid #007acc; padding-bottom: 10px; }
+        h2 { color: #555; margin-top: 30px; }
+        .subtitle { font-style: italic; color: #666; margin-bottom: 30px; }
+        .chapter { margin-bottom: 40px; page-break-after: always; }
+        .toc { background: #f9f9f9; padding: 20px; margin-bottom: 30px; }
+        .toc ul { list-style-type: none; }
+        .toc li { margin: 10px 0; }
+        .footer { text-align: center; margin-top: 50px; font-size: 0.9em; color: #666; }
+    </style>
+</head>
+<body>
+    <h1>{{ title }}</h1>
+    {% if subtitle %}<p class="subtitle">{{ subtitle }}</p>{% endif %}
+    
+    <div class="toc">
+        <h2>Table of Contents</h2>
+        <ul>
+        {% for chapter in chapters %}<li>Chapter {{ loop.index }}: {{ chapter.title }}</li>{% endfor %}
+        </ul>
+    </div>
+    
+    {% for chapter in chapters %}<div class="chapter"><h2>Chapter {{ loop.index }}: {{ chapter.title }}</h2><div>{{ chapter.content }}</div></div>{% endfor %}
+    
+    <div class="footer">
+        <p>This ebook comes with Private Label Rights (PLR). You may edit, rebrand, and resell this content.</p>
+        <p>Generated by Nosyt Automation System</p>
+    </div>
+</body>
+</html>
+""")
+
+class WhopAPIError(Exception):
+    """
+    A failed WHOP call, raised only where the caller asked for errors instead of an empty result
+    """
+
+class WhopRateLimit:
+    """
+    WHOP's remaining request quota, as reported by X-RateLimit-* response headers
+    
+    Shared by every caller of one integration so blocking and async uploads only
+    wait when the server says the window is nearly used up.
+    """
+    
+    def __init__(self, threshold: int = 2):
+        self.threshold = threshold
+        self.remaining: Optional[int] = None  # Unknown until the first response
+        self.reset_at = 0.0
+        self._lock = threading.Lock()
+    
+    def update(self, headers) -> None:
+        """
+        Record the quota from a response's headers
+        """
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset = headers.get('X-RateLimit-Reset')
+        if remaining is None:
+            return
+        
+        try:
+            remaining = int(remaining)
+            reset = float(reset) if reset is not None else 0.0
+        except ValueError:
+            return
+        
+        # The reset header is either an epoch timestamp or seconds until the window resets
+        now = time.time()
+        reset_at = reset if reset > now / 2 else now + reset
+        
+        with self._lock:
+            self.remaining = remaining
+            self.reset_at = reset_at
+    
+    def delay(self) -> float:
+        """
+        Claim one request from the quota and return how long to wait before sending it
+        """
+        with self._lock:
+            now = time.time()
+            if self.remaining is None or now >= self.reset_at:
+                self.remaining = None  # The window has rolled over; trust the next response
+                return 0.0
+            
+            if self.remaining > self.threshold:
+                self.remaining -= 1
+                return 0.0
+            
+            return self.reset_at - now
+    
+    def wait(self) -> None:
+        """
+        Block until the quota allows another request
+        """
+        seconds = self.delay()
+        if seconds > 0:
+            logger.info("⏳ WHOP rate limit nearly reached, waiting %.1fs", seconds)
+            time.sleep(seconds)
+    
+    async def wait_async(self) -> None:
+        """
+        Async counterpart of wait()
+        """
+        seconds = self.delay()
+        if seconds > 0:
+            logger.info("⏳ WHOP rate limit nearly reached, waiting %.1fs", seconds)
+            await asyncio.sleep(seconds)
+
+class ResponseCache:
+    """
+    LRU of GET results that are served directly for a short while after fetching
+    
+    Entries older than the TTL are kept (until evicted) so their ETag can be used
+    to revalidate them with a conditional request instead of refetching the body.
+    """
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Any, Tuple[float, Optional[str], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key) -> Tuple[bool, Optional[str], Any]:
+        """
+        Return (fresh, etag, data) for a key; data is None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None, None
+            
+            self._entries.move_to_end(key)
+            stored_at, etag, data = entry
+            return time.monotonic() - stored_at < self.ttl, etag, data
+    
+    def set(self, key, data: Any, etag: Optional[str] = None):
+        """
+        Store a fresh result, evicting the least recently used entry when full
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic(), etag, data)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, *keys):
+        """
+        Drop entries after a change on the server
+        """
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+class ActionLog:
+    """
+    Today's JSON-lines action log, kept open and reopened when the date changes
+    """
+    
+    def __init__(self, logs_dir: Path):
+        self.logs_dir = logs_dir
+        self._fp = None
+        self._date = None
+        self._lock = threading.Lock()  # Uploads log from worker threads and the event loop alike
+    
+    def write(self, line: bytes, today):
+        """
+        Append one entry to the log file for the given date
+        """
+        with self._lock:
+            if today != self._date:
+                if self._fp:
+                    self._fp.close()
+                self._fp = open(self.logs_dir / f"whop_api_{today.strftime('%Y%m%d')}.log", 'ab', buffering=1 << 16)
+                self._date = today
+            
+            self._fp.write(line)
+    
+    def close(self):
+        """
+        Flush and close the open log file
+        """
+        with self._lock:
+            if self._fp:
+                self._fp.close()
+                self._fp = None
+                self._date = None
 
 class WhopIntegration:
-    def __init__(self, api_key: str = None, company_id: str = None):
+    def __init__(self, api_key: str = None, company_id: str = None,
+                 product_index: Optional['WhopWebhookHandler'] = None):
+        _start_log_listener()
+        
         self.api_key = api_key or os.getenv('WHOP_API_KEY')
         self.company_id = company_id or os.getenv('WHOP_COMPANY_ID')
         self.base_url = "https://api.whop.com/api/v5"
@@ -22,29 +308,137 @@ class WhopIntegration:
             "Content-Type": "application/json"
         }
         
+        # One keep-alive connection pool shared by every upload in a batch. Content-Type is
+        # set per request so multipart uploads can carry their own boundary
+        self.client = httpx.Client(
+            http2=HTTP2_AVAILABLE,
+            headers={"Authorization": self.headers["Authorization"]},
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=8)
+        )
+        self.rate_limit = WhopRateLimit()
+        self.product_index = product_index  # Local catalog index, updated as products are created
+        self.cache = ResponseCache(ttl=float(os.getenv('WHOP_CACHE_TTL', 60)))
+        
         # Create logs directory
         self.logs_dir = Path('logs')
         self.logs_dir.mkdir(exist_ok=True)
         
+        # Today's action log stays open between entries
+        self._action_log = ActionLog(self.logs_dir)
+        
+        # Products already created, keyed by a hash of their data, so re-runs skip them
+        self._uploads = sqlite3.connect(self.logs_dir / 'uploads.sqlite', check_same_thread=False)
+        self._uploads_lock = threading.Lock()
+        with self._uploads_lock, self._uploads:
+            self._uploads.execute(
+                "CREATE TABLE IF NOT EXISTS uploads (key BLOB PRIMARY KEY, product_id TEXT, created_at REAL)"
+            )
+        
+        # Released by close(), on garbage collection or at exit; unlike atexit.register
+        # this holds no reference to the client itself, so discarded instances are freed
+        self._finalizer = weakref.finalize(self, self._release, self.client, self._action_log, self._uploads)
+    
+    def __enter__(self) -> 'WhopIntegration':
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Send a request on the shared client, pacing it by the server-reported quota
+        and retrying throttled or transient failures of idempotent calls
+        """
+        if 'json' in kwargs:
+            kwargs['content'], body_headers = self._json_body(kwargs.pop('json'))
+            kwargs['headers'] = {**body_headers, **(kwargs.get('headers') or {})}
+        
+        retryable = method in RETRY_METHODS
+        
+        for attempt in range(MAX_RETRIES + 1):
+            delay = 0.5 * 2 ** attempt
+            self.rate_limit.wait()
+            
+            try:
+                response = self.client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                if not retryable or attempt == MAX_RETRIES:
+                    raise
+            else:
+                self.rate_limit.update(response.headers)
+                if not retryable or response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                    return response
+                
+                retry_after = response.headers.get('Retry-After', '')
+                if retry_after.isdigit():
+                    delay = float(retry_after)
+            
+            time.sleep(delay)
+    
+    @staticmethod
+    def _json_body(payload: Any) -> Tuple[bytes, Dict[str, str]]:
+        """
+        Serialize a JSON request body, gzipping it when it is large enough to pay off
+        """
+        body = orjson.dumps(payload)
+        headers = {"Content-Type": "application/json"}
+        
+        if len(body) > GZIP_MIN_BYTES:
+            body = gzip.compress(body, compresslevel=1)
+            headers["Content-Encoding"] = "gzip"
+        
+        return body, headers
+    
+    def close(self):
+        """
+        Close the connection pool, the action log and the upload index
+        """
+        self._finalizer()
+    
+    @staticmethod
+    def _release(*resources):
+        """
+        Close the resources a client holds; never references the client itself
+        """
+        for resource in resources:
+            resource.close()
+    
+    def warm_up(self):
+        """
+        Open a pooled connection ahead of a batch so the first upload skips the TLS handshake
+        """
+        try:
+            self._request("HEAD", f"{self.base_url}/companies/{self.company_id}", timeout=10)
+        except httpx.HTTPError:
+            pass  # Only an optimization; uploads connect on their own
+    
     def create_product(self, product_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         Create a new product on WHOP marketplace
         """
-        print(f"📦 Creating product: {product_data.get('title', 'Untitled')}")
+        key = self._upload_key(product_data)
+        uploaded = self._uploaded_product(key, product_data)
+        if uploaded:
+            return uploaded
+        
+        logger.info("📦 Creating product: %s", product_data.get('title', 'Untitled'))
         
         # Map our product format to WHOP API format
         whop_product = self._format_for_whop_api(product_data)
         
         try:
-            response = requests.post(
-                f"{self.base_url}/companies/{self.company_id}/products",
-                headers=self.headers,
+            response = self._request(
+                "POST", f"{self.base_url}/companies/{self.company_id}/products",
                 json=whop_product
             )
             
             if response.status_code == 201:
-                result = response.json()
-                print(f"✅ Product created successfully! ID: {result.get('id')}")
+                result = orjson.loads(response.content)
+                logger.info("✅ Product created successfully! ID: %s", result.get('id'))
+                self.cache.invalidate('products')
+                self._remember_upload(key, result.get('id'))
+                self._index_created(whop_product, result)
                 
                 # Log successful creation
                 self._log_action('create_product', 'success', {
@@ -56,7 +450,7 @@ class WhopIntegration:
                 return result
             else:
                 error_msg = f"Failed to create product. Status: {response.status_code}, Response: {response.text}"
-                print(f"❌ {error_msg}")
+                logger.error("❌ %s", error_msg)
                 
                 # Log failure
                 self._log_action('create_product', 'error', {
@@ -66,32 +460,70 @@ class WhopIntegration:
                 
                 return None
                 
-        except Exception as e:
+        except API_ERRORS as e:
             error_msg = f"Exception creating product: {str(e)}"
-            print(f"❌ {error_msg}")
+            logger.error("❌ %s", error_msg)
             self._log_action('create_product', 'error', {'error': error_msg})
             return None
     
+    def _index_created(self, whop_product: Dict[str, Any], result: Dict[str, Any]):
+        """
+        Add a newly created product to the attached product index so it is seen before the next rebuild
+        """
+        if self.product_index is not None and result.get('id'):
+            self.product_index.upsert([{**whop_product, **result}])
+    
+    @staticmethod
+    def _upload_key(product_data: Dict[str, Any]) -> bytes:
+        """
+        Stable hash of a product's data, identical for byte-for-byte duplicate products
+        """
+        return hashlib.blake2b(orjson.dumps(product_data, option=orjson.OPT_SORT_KEYS), digest_size=16).digest()
+    
+    def _uploaded_product(self, key: bytes, product_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        The WHOP product already created from identical data, if any
+        """
+        with self._uploads_lock:
+            row = self._uploads.execute("SELECT product_id FROM uploads WHERE key = ?", (key,)).fetchone()
+        
+        if not row:
+            return None
+        
+        logger.info("♻️ Already uploaded, skipping: %s (ID: %s)", product_data.get('title', 'Untitled'), row[0])
+        return {'id': row[0], 'cached': True}
+    
+    def _remember_upload(self, key: bytes, product_id: Optional[str]):
+        """
+        Record a created product so identical data is never uploaded twice
+        """
+        if not product_id:
+            return
+        
+        with self._uploads_lock, self._uploads:
+            self._uploads.execute(
+                "INSERT OR REPLACE INTO uploads (key, product_id, created_at) VALUES (?, ?, ?)",
+                (key, product_id, time.time())
+            )
+    
     def upload_digital_asset(self, file_path: str, product_id: str) -> Optional[str]:
         """
         Upload digital file to WHOP for download delivery
         """
-        print(f"📤 Uploading digital asset for product {product_id}")
+        logger.info("📤 Uploading digital asset for product %s", product_id)
         
         try:
             with open(file_path, 'rb') as file:
-                files = {'file': file}
-                
-                response = requests.post(
-                    f"{self.base_url}/products/{product_id}/assets",
-                    headers={"Authorization": self.headers["Authorization"]},  # Remove Content-Type for file upload
-                    files=files
+                # httpx streams the multipart body from disk instead of building it in memory
+                response = self._request(
+                    "POST", f"{self.base_url}/products/{product_id}/assets",
+                    files={'file': (Path(file_path).name, file, 'application/octet-stream')}
                 )
                 
                 if response.status_code == 201:
-                    result = response.json()
+                    result = orjson.loads(response.content)
                     asset_id = result.get('id')
-                    print(f"✅ Asset uploaded successfully! ID: {asset_id}")
+                    logger.info("✅ Asset uploaded successfully! ID: %s", asset_id)
                     
                     self._log_action('upload_asset', 'success', {
                         'product_id': product_id,
@@ -102,18 +534,108 @@ class WhopIntegration:
                     return asset_id
                 else:
                     error_msg = f"Failed to upload asset. Status: {response.status_code}"
-                    print(f"❌ {error_msg}")
+                    logger.error("❌ %s", error_msg)
                     return None
                     
-        except Exception as e:
-            print(f"❌ Error uploading asset: {e}")
+        except (*API_ERRORS, OSError) as e:
+            logger.error("❌ Error uploading asset: %s", e)
+            return None
+    
+    def upload_digital_asset_chunked(self, file_path: str, product_id: str, chunk_size: int = 5 * 1024 * 1024,
+                                     parallelism: int = 4) -> Optional[str]:
+        """
+        Upload a large digital file as parallel parts, falling back to a single POST
+        for small files or when WHOP does not accept multipart uploads
+        """
+        size = os.path.getsize(file_path)
+        if size <= chunk_size:
+            return self.upload_digital_asset(file_path, product_id)
+        
+        logger.info("📤 Uploading digital asset for product %s in parts", product_id)
+        
+        try:
+            response = self._request(
+                "POST", f"{self.base_url}/products/{product_id}/uploads",
+                json={'filename': Path(file_path).name, 'size': size}
+            )
+            
+            if response.status_code not in (200, 201):
+                logger.warning("⚠️ Multipart upload unavailable (status %s), sending as one file", response.status_code)
+                return self.upload_digital_asset(file_path, product_id)
+            
+            upload_id = orjson.loads(response.content).get('id')
+            ranges = [(offset, min(chunk_size, size - offset)) for offset in range(0, size, chunk_size)]
+            etags: List[Optional[str]] = [None] * len(ranges)
+            
+            with open(file_path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                with ThreadPoolExecutor(max_workers=parallelism) as executor:
+                    futures = {
+                        executor.submit(self._upload_part, upload_id, part + 1, data, offset, length): part
+                        for part, (offset, length) in enumerate(ranges)
+                    }
+                    
+                    for done, future in enumerate(as_completed(futures), 1):
+                        etags[futures[future]] = future.result()
+                        logger.info("📦 Part %s/%s uploaded", done, len(ranges))
+            
+            response = self._request(
+                "POST", f"{self.base_url}/uploads/{upload_id}/complete",
+                json={'parts': [{'part_number': part, 'etag': etag} for part, etag in enumerate(etags, 1)]}
+            )
+            
+            if response.status_code in (200, 201):
+                asset_id = orjson.loads(response.content).get('id')
+                logger.info("✅ Asset uploaded successfully! ID: %s", asset_id)
+                
+                self._log_action('upload_asset', 'success', {
+                    'product_id': product_id,
+                    'asset_id': asset_id,
+                    'file_path': file_path,
+                    'parts': len(ranges)
+                })
+                
+                return asset_id
+            else:
+                logger.error("❌ Failed to complete upload. Status: %s", response.status_code)
+                return None
+                
+        except (*API_ERRORS, OSError, RuntimeError) as e:
+            logger.error("❌ Error uploading asset: %s", e)
             return None
     
+    def _upload_part(self, upload_id: str, part_number: int, data: mmap.mmap, offset: int, length: int,
+                     max_attempts: int = 5) -> Optional[str]:
+        """
+        PUT one part of a multipart upload, retrying throttled and transient failures
+        """
+        chunk = data[offset:offset + length]  # Sliced per worker so only in-flight parts are in memory
+        
+        for attempt in range(1, max_attempts + 1):
+            try:
+                response = self._request(
+                    "PUT", f"{self.base_url}/uploads/{upload_id}/parts/{part_number}",
+                    content=chunk,
+                    headers={"Content-Type": "application/octet-stream"}
+                )
+                
+                if response.status_code in (200, 201):
+                    return response.headers.get('ETag') or orjson.loads(response.content).get('etag')
+                if response.status_code != 429 and response.status_code < 500:
+                    raise RuntimeError(f"Part {part_number} rejected. Status: {response.status_code}")
+                error = f"status {response.status_code}"
+            except httpx.HTTPError as e:
+                error = str(e)
+            
+            if attempt < max_attempts:
+                time.sleep(min(2 ** attempt, 30) * random.uniform(0.5, 1))  # Backoff with jitter
+        
+        raise RuntimeError(f"Part {part_number} failed after {max_attempts} attempts: {error}")
+    
     def create_membership_product(self, membership_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         Create a membership/subscription product
         """
-        print(f"🎫 Creating membership: {membership_data.get('title')}")
+        logger.info("🎫 Creating membership: %s", membership_data.get('title'))
         
         whop_membership = {
             "title": membership_data.get('title'),
@@ -133,97 +655,164 @@ class WhopIntegration:
         }
         
         try:
-            response = requests.post(
-                f"{self.base_url}/companies/{self.company_id}/products",
-                headers=self.headers,
+            response = self._request(
+                "POST", f"{self.base_url}/companies/{self.company_id}/products",
                 json=whop_membership
             )
             
             if response.status_code == 201:
-                result = response.json()
-                print(f"✅ Membership created! ID: {result.get('id')}")
+                result = orjson.loads(response.content)
+                logger.info("✅ Membership created! ID: %s", result.get('id'))
+                self.cache.invalidate('products')
                 return result
             else:
-                print(f"❌ Failed to create membership: {response.text}")
+                logger.error("❌ Failed to create membership: %s", response.text)
                 return None
                 
-        except Exception as e:
-            print(f"❌ Error creating membership: {e}")
+        except API_ERRORS as e:
+            logger.error("❌ Error creating membership: %s", e)
             return None
     
     def update_product_pricing(self, product_id: str, new_price: int) -> bool:
         """
         Update product pricing (for A/B testing)
         """
-        print(f"💰 Updating price for product {product_id} to ${new_price/100:.2f}")
+        logger.info("💰 Updating price for product %s to $%.2f", product_id, new_price/100)
         
         try:
-            response = requests.patch(
-                f"{self.base_url}/products/{product_id}",
-                headers=self.headers,
+            response = self._request(
+                "PATCH", f"{self.base_url}/products/{product_id}",
                 json={"price": new_price}
             )
             
             if response.status_code == 200:
-                print(f"✅ Price updated successfully")
+                logger.info("✅ Price updated successfully")
+                self.cache.invalidate(('analytics', product_id), 'products')
                 self._log_action('update_price', 'success', {
                     'product_id': product_id,
                     'new_price': new_price
                 })
                 return True
             else:
-                print(f"❌ Failed to update price: {response.text}")
+                logger.error("❌ Failed to update price: %s", response.text)
                 return False
                 
-        except Exception as e:
-            print(f"❌ Error updating price: {e}")
+        except API_ERRORS as e:
+            logger.error("❌ Error updating price: %s", e)
             return False
     
     def get_product_analytics(self, product_id: str) -> Optional[Dict[str, Any]]:
         """
         Fetch product performance analytics
         """
+        key = ('analytics', product_id)
+        fresh, etag, cached = self.cache.get(key)
+        if fresh:
+            return cached
+        
         try:
-            response = requests.get(
-                f"{self.base_url}/products/{product_id}/analytics",
-                headers=self.headers
+            # Revalidate a stale entry instead of downloading it again
+            response = self._request(
+                "GET", f"{self.base_url}/products/{product_id}/analytics",
+                headers={"If-None-Match": etag} if etag else None
             )
             
-            if response.status_code == 200:
-                return response.json()
+            if response.status_code == 304 and cached is not None:
+                self.cache.set(key, cached, etag)
+                return cached
+            elif response.status_code == 200:
+                analytics = orjson.loads(response.content)
+                self.cache.set(key, analytics, response.headers.get('ETag'))
+                return analytics
             else:
-                print(f"❌ Failed to fetch analytics: {response.text}")
+                logger.error("❌ Failed to fetch analytics: %s", response.text)
                 return None
                 
-        except Exception as e:
-            print(f"❌ Error fetching analytics: {e}")
+        except API_ERRORS as e:
+            logger.error("❌ Error fetching analytics: %s", e)
             return None
     
     def list_products(self) -> List[Dict[str, Any]]:
         """
         List all products in the company
         """
-        try:
-            response = requests.get(
-                f"{self.base_url}/companies/{self.company_id}/products",
-                headers=self.headers
-            )
+        fresh, _, cached = self.cache.get('products')
+        if fresh:
+            return list(cached)
+        
+        products = list(self.iter_products())
+        if products:  # iter_products stops quietly on errors; don't pin an empty listing
+            self.cache.set('products', products)
+        return list(products)
+    
+    def iter_products(self, filters: Optional[Dict[str, Any]] = None, page_size: int = 100,
+                      strict: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Yield company products page by page, optionally filtered
+        
+        Errors end the listing quietly unless strict is set, in which case they raise
+        WhopAPIError so callers can tell a failed listing from an empty catalog.
+
+        Filters use dotted keys (e.g. {'metadata.auto_generated': True}). They are
+        sent as query parameters and also checked locally, so results are correct
+        whether or not the API applies them server-side.
+        """
+        filters = filters or {}
+        params = {'per': page_size}
+        params.update({key: str(value).lower() if isinstance(value, bool) else value
+                       for key, value in filters.items()})
+        position = {'page': 1}
+        
+        while position:
+            try:
+                response = self._request(
+                    "GET", f"{self.base_url}/companies/{self.company_id}/products",
+                    params={**params, **position}
+                )
+                
+                if response.status_code != 200:
+                    logger.error("❌ Failed to list products: %s", response.text)
+                    if strict:
+                        raise WhopAPIError(f"Failed to list products. Status: {response.status_code}")
+                    return
+                
+                body = orjson.loads(response.content)
+                
+            except API_ERRORS as e:
+                logger.error("❌ Error listing products: %s", e)
+                if strict:
+                    raise WhopAPIError(f"Error listing products: {e}") from e
+                return
             
-            if response.status_code == 200:
-                return response.json().get('data', [])
+            for product in body.get('data', []):
+                if all(self._lookup(product, key) == value for key, value in filters.items()):
+                    yield product
+            
+            # Follow a cursor when the API hands one out, page numbers otherwise
+            pagination = body.get('pagination', {})
+            if pagination.get('next_cursor'):
+                position = {'after': pagination['next_cursor']}
+            elif pagination.get('next_page'):
+                position = {'page': pagination['next_page']}
             else:
-                print(f"❌ Failed to list products: {response.text}")
-                return []
-                
-        except Exception as e:
-            print(f"❌ Error listing products: {e}")
-            return []
+                position = None
+    
+    @staticmethod
+    def _lookup(data: Dict[str, Any], dotted_key: str) -> Any:
+        """
+        Resolve a dotted key such as 'metadata.auto_generated' in nested dicts
+        """
+        for part in dotted_key.split('.'):
+            if not isinstance(data, dict):
+                return None
+            data = data.get(part)
+        return data
     
     def setup_webhook(self, webhook_url: str, events: List[str]) -> Optional[str]:
         """
         Setup webhook for automated notifications
         """
-        print(f"🔗 Setting up webhook: {webhook_url}")
+        logger.info("🔗 Setting up webhook: %s", webhook_url)
         
         webhook_data = {
             "url": webhook_url,
@@ -232,23 +821,22 @@ class WhopIntegration:
         }
         
         try:
-            response = requests.post(
-                f"{self.base_url}/companies/{self.company_id}/webhooks",
-                headers=self.headers,
+            response = self._request(
+                "POST", f"{self.base_url}/companies/{self.company_id}/webhooks",
                 json=webhook_data
             )
             
             if response.status_code == 201:
-                result = response.json()
+                result = orjson.loads(response.content)
                 webhook_id = result.get('id')
-                print(f"✅ Webhook created! ID: {webhook_id}")
+                logger.info("✅ Webhook created! ID: %s", webhook_id)
                 return webhook_id
             else:
-                print(f"❌ Failed to create webhook: {response.text}")
+                logger.error("❌ Failed to create webhook: %s", response.text)
                 return None
                 
-        except Exception as e:
-            print(f"❌ Error creating webhook: {e}")
+        except API_ERRORS as e:
+            logger.error("❌ Error creating webhook: %s", e)
             return None
     
     def _format_for_whop_api(self, product_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -278,55 +866,144 @@ class WhopIntegration:
         }
         
         # Add product-specific fields
-        if product_type == 'ebook':
-            whop_product["metadata"].update({
-                "chapters": len(product_data.get('chapters', [])),
-                "formats": ["PDF", "EPUB", "DOCX"]
-            })
-        elif product_type == 'notion_template':
-            whop_product["metadata"].update({
-                "template_type": product_data.get('template_type'),
-                "use_case": product_data.get('use_case')
-            })
-        elif product_type == 'digital_planner':
-            whop_product["metadata"].update({
-                "planner_type": product_data.get('planner_type'),
-                "period": product_data.get('period'),
-                "formats": product_data.get('formats', [])
-            })
+        type_meta = _TYPE_META.get(product_type)
+        if type_meta:
+            whop_product["metadata"].update(type_meta(product_data))
         
         return whop_product
     
-    def _get_category(self, product_type: str) -> str:
+    @staticmethod
+    def _get_category(product_type: str) -> str:
         """
         Map product types to WHOP categories
         """
-        category_mapping = {
-            'ebook': 'education',
-            'notion_template': 'productivity',
-            'digital_planner': 'productivity',
-            'email_templates': 'marketing',
-            'course': 'education',
-            'membership': 'community'
-        }
-        
-        return category_mapping.get(product_type, 'other')
+        return _CATEGORY_MAPPING.get(product_type, 'other')
     
     def _log_action(self, action: str, status: str, data: Dict[str, Any]):
         """
         Log API actions for monitoring and debugging
         """
+        now = datetime.now()
         log_entry = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': now.isoformat(),
             'action': action,
             'status': status,
             'data': data
         }
+        self._action_log.write(orjson.dumps(log_entry) + b'\n', now.date())
+
+class WhopWebhookHandler:
+    """
+    Local SQLite index of company products, kept current by WHOP webhook events
+    
+    Events reach handle_event through webhook_server, which the launcher starts
+    when WHOP_WEBHOOK_PORT is set. Without it the index only changes through our
+    own creates and price updates plus periodic warm() rebuilds, so changes made
+    elsewhere show up at the next rebuild.
+    """
+    
+    PRODUCT_EVENTS = ('product.created', 'product.updated')
+    
+    def __init__(self, db_path: str = 'cache/products.sqlite'):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
         
-        log_file = self.logs_dir / f"whop_api_{datetime.now().strftime('%Y%m%d')}.log"
+        with self._lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS products (id TEXT PRIMARY KEY, json BLOB, updated_at REAL)"
+            )
+            self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value REAL)")
+    
+    def handle_event(self, event: Dict[str, Any]) -> bool:
+        """
+        Apply a webhook payload to the index; returns True if it changed a product
+        """
+        action = event.get('action') or event.get('type')
+        product = event.get('data') or {}
+        
+        if action in self.PRODUCT_EVENTS and product.get('id'):
+            self.upsert([product])
+            return True
+        elif action == 'product.deleted' and product.get('id'):
+            with self._lock, self._db:
+                self._db.execute("DELETE FROM products WHERE id = ?", (product['id'],))
+            return True
+        
+        return False
+    
+    def upsert(self, products: List[Dict[str, Any]]):
+        """
+        Insert or replace products in the index
+        """
+        now = time.time()
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO products (id, json, updated_at) VALUES (?, ?, ?)",
+                [(product['id'], orjson.dumps(product), now) for product in products]
+            )
+    
+    def update_fields(self, product_id: str, fields: Dict[str, Any]):
+        """
+        Merge changed fields into an indexed product (e.g. after our own price update)
+        """
+        with self._lock:
+            row = self._db.execute("SELECT json FROM products WHERE id = ?", (product_id,)).fetchone()
+        
+        if row:
+            product = orjson.loads(row[0])
+            product.update(fields)
+            self.upsert([product])
+    
+    def warm(self, whop: WhopIntegration, page_size: int = 100) -> int:
+        """
+        Rebuild the index from one paginated pass over the WHOP catalog
+        
+        A failed or empty listing keeps the current index and its warm time, so
+        the next check retries instead of trusting an empty catalog for a day.
+        """
+        try:
+            products = list(whop.iter_products(page_size=page_size, strict=True))
+        except WhopAPIError as e:
+            logger.warning("⚠️ Product index not rebuilt, keeping previous entries: %s", e)
+            return 0
+        
+        if not products:
+            logger.warning("⚠️ WHOP returned no products, keeping previous index entries")
+            return 0
+        
+        # Swap the contents in one transaction so readers never see a half-built index
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM products")
+            self._db.executemany(
+                "INSERT OR REPLACE INTO products (id, json, updated_at) VALUES (?, ?, ?)",
+                [(product['id'], orjson.dumps(product), now) for product in products]
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('warmed_at', ?)", (now,)
+            )
+        
+        logger.info("🗂  Product index warmed with %s products", len(products))
+        return len(products)
+    
+    def warmed_at(self) -> Optional[float]:
+        """
+        Unix time of the last full rebuild, or None if never warmed
+        """
+        with self._lock:
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'warmed_at'").fetchone()
+        return row[0] if row else None
+    
+    def iter_products(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield every indexed product
+        """
+        with self._lock:
+            rows = self._db.execute("SELECT json FROM products").fetchall()
         
-        with open(log_file, 'a') as f:
-            f.write(json.dumps(log_entry) + '\n')
+        for (blob,) in rows:
+            yield orjson.loads(blob)
 
 class BatchUploader:
     """
@@ -335,7 +1012,6 @@ class BatchUploader:
     
     def __init__(self, whop_integration: WhopIntegration):
         self.whop = whop_integration
-        self.upload_delay = 2  # Seconds between uploads to respect rate limits
     
     def upload_products_from_directory(self, products_dir: str) -> Dict[str, Any]:
         """
@@ -343,11 +1019,11 @@ class BatchUploader:
         """
         products_path = Path(products_dir)
         if not products_path.exists():
-            print(f"❌ Products directory not found: {products_dir}")
+            logger.error("❌ Products directory not found: %s", products_dir)
             return {'success': 0, 'failed': 0, 'products': []}
         
         json_files = list(products_path.glob('*.json'))
-        print(f"📦 Found {len(json_files)} products to upload")
+        logger.info("📦 Found %s products to upload", len(json_files))
         
         results = {
             'success': 0,
@@ -355,41 +1031,123 @@ class BatchUploader:
             'products': []
         }
         
-        for file_path in json_files:
-            try:
-                with open(file_path, 'r') as f:
-                    product_data = json.load(f)
-                
-                # Upload to WHOP
-                result = self.whop.create_product(product_data)
-                
-                if result:
-                    results['success'] += 1
-                    results['products'].append({
-                        'title': product_data.get('title'),
-                        'whop_id': result.get('id'),
-                        'status': 'success'
-                    })
+        # Read and parse product files on worker threads while earlier ones upload
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            loads = [(file_path, executor.submit(self._read_product, file_path)) for file_path in json_files]
+            if loads:
+                self.whop.warm_up()
+            
+            for file_path, loaded in loads:
+                try:
+                    product_data = loaded.result()
                     
-                    # Generate and upload digital files if needed
-                    self._create_digital_files(product_data, result.get('id'))
-                else:
+                    # Upload to WHOP; requests are paced by the server-reported rate limit
+                    self.upload_product(product_data, results)
+                    
+                except Exception as e:
+                    logger.error("❌ Error processing %s: %s", file_path, e)
                     results['failed'] += 1
-                    results['products'].append({
-                        'title': product_data.get('title'),
-                        'status': 'failed'
-                    })
-                
-                # Rate limiting
-                time.sleep(self.upload_delay)
-                
-            except Exception as e:
-                print(f"❌ Error processing {file_path}: {e}")
-                results['failed'] += 1
         
-        print(f"\n🎉 Upload complete! Success: {results['success']}, Failed: {results['failed']}")
+        logger.info("\n🎉 Upload complete! Success: %s, Failed: %s", results['success'], results['failed'])
         return results
     
+    async def upload_products_from_directory_async(self, products_dir: str, concurrency: int = 8) -> Dict[str, Any]:
+        """
+        Upload all generated products from a directory, several at a time
+        """
+        products_path = Path(products_dir)
+        if not products_path.exists():
+            logger.error("❌ Products directory not found: %s", products_dir)
+            return {'success': 0, 'failed': 0, 'products': []}
+        
+        json_files = list(products_path.glob('*.json'))
+        logger.info("📦 Found %s products to upload", len(json_files))
+        
+        results = {
+            'success': 0,
+            'failed': 0,
+            'products': []
+        }
+        
+        # Imported lazily so the blocking uploader works without aiohttp installed
+        if __package__:
+            from .whop_integration_async import AsyncWhopIntegration
+        else:
+            from whop_integration_async import AsyncWhopIntegration
+        
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def upload(client: AsyncWhopIntegration, file_path: Path):
+            async with semaphore:
+                try:
+                    async with aiofiles.open(file_path, 'rb') as f:
+                        product_data = orjson.loads(await f.read())
+                    
+                    result = await client.create_product(product_data)
+                    if result and not result.get('cached'):
+                        # File generation is blocking disk work, so keep it off the event loop
+                        await loop.run_in_executor(None, self._create_digital_files, product_data, result.get('id'))
+                    self._record_upload(results, product_data, result)
+                    
+                except Exception as e:
+                    logger.error("❌ Error processing %s: %s", file_path, e)
+                    results['failed'] += 1
+        
+        async with AsyncWhopIntegration(self.whop, limit_per_host=max(concurrency, 16)) as client:
+            if json_files:
+                await client.warm_up()
+            await asyncio.gather(*[upload(client, file_path) for file_path in json_files])
+        
+        logger.info("\n🎉 Upload complete! Success: %s, Failed: %s", results['success'], results['failed'])
+        return results
+    
+    @staticmethod
+    def _read_product(file_path: Path) -> Dict[str, Any]:
+        """
+        Load one generated product file
+        """
+        return orjson.loads(file_path.read_bytes())
+    
+    def upload_product(self, product_data: Dict[str, Any], results: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Upload a single product and record the outcome in a batch results dict
+        """
+        result = self._upload_product(product_data)
+        self._record_upload(results, product_data, result)
+        return result
+    
+    def _upload_product(self, product_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Create a product on WHOP and build its digital files
+        """
+        result = self.whop.create_product(product_data)
+        
+        # Already-uploaded products got their files when they were first created
+        if result and not result.get('cached'):
+            # Generate and upload digital files if needed
+            self._create_digital_files(product_data, result.get('id'))
+        
+        return result
+    
+    def _record_upload(self, results: Dict[str, Any], product_data: Dict[str, Any], result: Optional[Dict[str, Any]]):
+        """
+        Add the outcome of one upload to the batch results
+        """
+        if result:
+            results['success'] += 1
+            results['products'].append({
+                'title': product_data.get('title'),
+                'whop_id': result.get('id'),
+                'status': 'success'
+            })
+        else:
+            results['failed'] += 1
+            results['products'].append({
+                'title': product_data.get('title'),
+                'status': 'failed'
+            })
+    
     def _create_digital_files(self, product_data: Dict[str, Any], product_id: str):
         """
         Create actual digital files from product data
@@ -409,142 +1167,100 @@ class BatchUploader:
         """
         Create downloadable ebook files (PDF, DOCX, etc.)
         """
+        product_data = self._with_chapters(product_data)
+        
         # Create output directory
         output_dir = Path(f'output/{product_id}')
         output_dir.mkdir(parents=True, exist_ok=True)
         
-        # Generate HTML content
-        html_content = self._generate_ebook_html(product_data)
-        
-        # Save HTML file
-        html_file = output_dir / 'ebook.html'
-        with open(html_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        # Create text version
-        text_content = self._generate_ebook_text(product_data)
-        text_file = output_dir / 'ebook.txt'
-        with open(text_file, 'w', encoding='utf-8') as f:
-            f.write(text_content)
+        # Generate every format in one pass over the chapters
+        html_content, text_content, md_content = self._generate_ebook_all(product_data)
         
-        # Create markdown version
-        md_content = self._generate_ebook_markdown(product_data)
-        md_file = output_dir / 'ebook.md'
-        with open(md_file, 'w', encoding='utf-8') as f:
-            f.write(md_content)
+        # Save the HTML, text and markdown versions side by side
+        self._write_files([
+            (output_dir / 'ebook.html', html_content),
+            (output_dir / 'ebook.txt', text_content),
+            (output_dir / 'ebook.md', md_content)
+        ])
         
-        print(f"📚 Ebook files created in {output_dir}")
+        logger.info("📚 Ebook files created in %s", output_dir)
     
-    def _generate_ebook_html(self, product_data: Dict[str, Any]) -> str:
+    @staticmethod
+    def _write_files(files: List[Tuple[Path, str]]):
         """
-        Generate HTML version of ebook
-        """
-        title = product_data.get('title', 'Untitled Ebook')
-        subtitle = product_data.get('subtitle', '')
-        chapters = product_data.get('chapters', [])
-        
-        html = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{title}</title>
-    <style>
-        body {{ font-family: Georgia, serif; line-height: 1.6; max-width: 800px; margin: 0 auto; padding: 20px; }}
-        h1 {{ color: #333; border-bottom: 3px solid #007acc; padding-bottom: 10px; }}
-        h2 {{ color: #555; margin-top: 30px; }}
-        .subtitle {{ font-style: italic; color: #666; margin-bottom: 30px; }}
-        .chapter {{ margin-bottom: 40px; page-break-after: always; }}
-        .toc {{ background: #f9f9f9; padding: 20px; margin-bottom: 30px; }}
-        .toc ul {{ list-style-type: none; }}
-        .toc li {{ margin: 10px 0; }}
-        .footer {{ text-align: center; margin-top: 50px; font-size: 0.9em; color: #666; }}
-    </style>
-</head>
-<body>
-    <h1>{title}</h1>
-    {f'<p class="subtitle">{subtitle}</p>' if subtitle else ''}
-    
-    <div class="toc">
-        <h2>Table of Contents</h2>
-        <ul>
-        {''.join([f'<li>Chapter {i+1}: {chapter["title"]}</li>' for i, chapter in enumerate(chapters)])}
-        </ul>
-    </div>
-    
-    {''.join([f'<div class="chapter"><h2>Chapter {i+1}: {chapter["title"]}</h2><div>{chapter["content"]}</div></div>' for i, chapter in enumerate(chapters)])}
-    
-    <div class="footer">
-        <p>This ebook comes with Private Label Rights (PLR). You may edit, rebrand, and resell this content.</p>
-        <p>Generated by Nosyt Automation System</p>
-    </div>
-</body>
-</html>
+        Write several output files concurrently; file writes release the GIL
         """
-        
-        return html
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            # list() so a failed write raises here
+            list(executor.map(lambda item: item[0].write_bytes(item[1].encode('utf-8')), files))
     
-    def _generate_ebook_text(self, product_data: Dict[str, Any]) -> str:
+    def _with_chapters(self, product_data: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Generate plain text version of ebook
+        Load an ebook's chapters from the JSONL file the generator streamed them to
         """
-        title = product_data.get('title', 'Untitled Ebook')
-        subtitle = product_data.get('subtitle', '')
-        chapters = product_data.get('chapters', [])
-        
-        text = f"{title}\n{'=' * len(title)}\n\n"
-        
-        if subtitle:
-            text += f"{subtitle}\n\n"
-        
-        text += "TABLE OF CONTENTS\n-----------------\n"
-        for i, chapter in enumerate(chapters):
-            text += f"Chapter {i+1}: {chapter['title']}\n"
-        
-        text += "\n\n"
+        chapters_file = product_data.get('chapters_file')
+        if 'chapters' in product_data or not chapters_file:
+            return product_data
         
-        for i, chapter in enumerate(chapters):
-            text += f"Chapter {i+1}: {chapter['title']}\n"
-            text += "-" * (len(chapter['title']) + 12) + "\n\n"
-            text += chapter['content'] + "\n\n"
+        with open(chapters_file, 'rb') as f:
+            chapters = [orjson.loads(line) for line in f if line.strip()]
         
-        text += "\n" + "=" * 50 + "\n"
-        text += "This ebook comes with Private Label Rights (PLR).\n"
-        text += "You may edit, rebrand, and resell this content.\n"
-        text += "Generated by Nosyt Automation System\n"
-        
-        return text
+        return {**product_data, 'chapters': chapters}
     
-    def _generate_ebook_markdown(self, product_data: Dict[str, Any]) -> str:
+    def _generate_ebook_all(self, product_data: Dict[str, Any]) -> Tuple[str, str, str]:
         """
-        Generate Markdown version of ebook
+        Generate the HTML, plain text and Markdown versions of an ebook
+        
+        HTML comes from the compiled Jinja template; the two text formats share one
+        pass over the chapters.
         """
         title = product_data.get('title', 'Untitled Ebook')
         subtitle = product_data.get('subtitle', '')
         chapters = product_data.get('chapters', [])
         
-        md = f"# {title}\n\n"
+        # Tables of contents and chapter bodies for the text formats fill in lockstep
+        text_toc, text_body = io.StringIO(), io.StringIO()
+        md_toc, md_body = io.StringIO(), io.StringIO()
         
-        if subtitle:
-            md += f"*{subtitle}*\n\n"
-        
-        md += "## Table of Contents\n\n"
-        for i, chapter in enumerate(chapters):
-            md += f"{i+1}. {chapter['title']}\n"
+        for i, chapter in enumerate(chapters, 1):
+            chapter_title, content = chapter['title'], chapter['content']
+            heading = f"Chapter {i}: {chapter_title}"
+            
+            text_toc.write(f"{heading}\n")
+            text_body.write(f"{heading}\n{'-' * (len(chapter_title) + 12)}\n\n{content}\n\n")
+            
+            md_toc.write(f"{i}. {chapter_title}\n")
+            md_body.write(f"## {heading}\n\n{content}\n\n")
         
-        md += "\n---\n\n"
+        html = _EBOOK_HTML.render(title=title, subtitle=subtitle, chapters=chapters)
         
-        for i, chapter in enumerate(chapters):
-            md += f"## Chapter {i+1}: {chapter['title']}\n\n"
-            md += chapter['content'] + "\n\n"
+        text = io.StringIO()
+        text.write(f"{title}\n{'=' * len(title)}\n\n")
+        if subtitle:
+            text.write(f"{subtitle}\n\n")
+        text.write("TABLE OF CONTENTS\n-----------------\n")
+        text.write(text_toc.getvalue())
+        text.write("\n\n")
+        text.write(text_body.getvalue())
+        text.write("\n" + "=" * 50 + "\n")
+        text.write("This ebook comes with Private Label Rights (PLR).\n")
+        text.write("You may edit, rebrand, and resell this content.\n")
+        text.write("Generated by Nosyt Automation System\n")
         
-        md += "---\n\n"
-        md += "**PLR License**: This ebook comes with Private Label Rights (PLR). "
-        md += "You may edit, rebrand, and resell this content.\n\n"
-        md += "*Generated by Nosyt Automation System*\n"
+        md = io.StringIO()
+        md.write(f"# {title}\n\n")
+        if subtitle:
+            md.write(f"*{subtitle}*\n\n")
+        md.write("## Table of Contents\n\n")
+        md.write(md_toc.getvalue())
+        md.write("\n---\n\n")
+        md.write(md_body.getvalue())
+        md.write("---\n\n")
+        md.write("**PLR License**: This ebook comes with Private Label Rights (PLR). ")
+        md.write("You may edit, rebrand, and resell this content.\n\n")
+        md.write("*Generated by Nosyt Automation System*\n")
         
-        return md
+        return html, text.getvalue(), md.getvalue()
     
     def _create_notion_template_files(self, product_data: Dict[str, Any], product_id: str):
         """
@@ -555,8 +1271,8 @@ class BatchUploader:
         
         # Create JSON structure file
         structure_file = output_dir / 'notion_structure.json'
-        with open(structure_file, 'w') as f:
-            json.dump(product_data.get('structure', {}), f, indent=2)
+        with open(structure_file, 'wb') as f:
+            f.write(orjson.dumps(product_data.get('structure', {}), option=orjson.OPT_INDENT_2))
         
         # Create instructions file
         instructions = product_data.get('instructions', [])
@@ -566,7 +1282,7 @@ class BatchUploader:
             for i, instruction in enumerate(instructions, 1):
                 f.write(f"{i}. {instruction}\n")
         
-        print(f"📋 Notion template files created in {output_dir}")
+        logger.info("📋 Notion template files created in %s", output_dir)
     
     def _create_planner_files(self, product_data: Dict[str, Any], product_id: str):
         """
@@ -577,8 +1293,8 @@ class BatchUploader:
         
         # Create planner structure file
         planner_file = output_dir / 'planner_layouts.json'
-        with open(planner_file, 'w') as f:
-            json.dump(product_data.get('layouts', {}), f, indent=2)
+        with open(planner_file, 'wb') as f:
+            f.write(orjson.dumps(product_data.get('layouts', {}), option=orjson.OPT_INDENT_2))
         
         # Create PDF instructions
         instructions_file = output_dir / 'planner_instructions.md'
@@ -589,7 +1305,7 @@ class BatchUploader:
             for format_type in product_data.get('formats', []):
                 f.write(f"- {format_type}\n")
         
-        print(f"📅 Planner files created in {output_dir}")
+        logger.info("📅 Planner files created in %s", output_dir)
     
     def _create_email_template_files(self, product_data: Dict[str, Any], product_id: str):
         """
@@ -599,22 +1315,23 @@ class BatchUploader:
         output_dir.mkdir(parents=True, exist_ok=True)
         
         templates = product_data.get('templates', [])
+        files = []
         
         for i, template in enumerate(templates, 1):
-            # Create HTML version
-            html_file = output_dir / f'template_{i}_{template["type"]}.html'
-            with open(html_file, 'w') as f:
-                f.write(f"<!DOCTYPE html>\n<html>\n<head>\n<title>{template['subject_line']}</title>\n</head>\n<body>\n")
-                f.write(template['content'].replace('\n', '<br>\n'))
-                f.write("\n</body>\n</html>")
+            name = f'template_{i}_{template["type"]}'
             
-            # Create plain text version
-            txt_file = output_dir / f'template_{i}_{template["type"]}.txt'
-            with open(txt_file, 'w') as f:
-                f.write(f"Subject: {template['subject_line']}\n\n")
-                f.write(template['content'])
+            # HTML version
+            files.append((output_dir / f'{name}.html',
+                          f"<!DOCTYPE html>\n<html>\n<head>\n<title>{template['subject_line']}</title>\n</head>\n<body>\n"
+                          + template['content'].replace('\n', '<br>\n')
+                          + "\n</body>\n</html>"))
+            
+            # Plain text version
+            files.append((output_dir / f'{name}.txt', f"Subject: {template['subject_line']}\n\n" + template['content']))
+        
+        self._write_files(files)
         
-        print(f"📧 Email template files created in {output_dir}")
+        logger.info("📧 Email template files created in %s", output_dir)
 
 # Demo and testing functions
 def main():
@@ -626,22 +1343,22 @@ def main():
     
     # Check if we have valid credentials
     if not whop.api_key or not whop.company_id:
-        print("❌ Please set WHOP_API_KEY and WHOP_COMPANY_ID environment variables")
+        logger.error("❌ Please set WHOP_API_KEY and WHOP_COMPANY_ID environment variables")
         return
     
-    print("🚀 WHOP Integration Demo")
+    logger.info("🚀 WHOP Integration Demo")
     
     # List existing products
     products = whop.list_products()
-    print(f"📦 Found {len(products)} existing products")
+    logger.info("📦 Found %s existing products", len(products))
     
     # Test batch upload
     uploader = BatchUploader(whop)
-    results = uploader.upload_products_from_directory('generated_products')
+    results = asyncio.run(uploader.upload_products_from_directory_async('generated_products'))
     
-    print(f"\n📊 Upload Results:")
-    print(f"✅ Successful: {results['success']}")
-    print(f"❌ Failed: {results['failed']}")
+    logger.info("\n📊 Upload Results:")
+    logger.info("✅ Successful: %s", results['success'])
+    logger.info("❌ Failed: %s", results['failed'])
     
     # Setup webhooks for automation
     webhook_events = [
@@ -654,9 +1371,9 @@ def main():
     webhook_id = whop.setup_webhook(webhook_url, webhook_events)
     
     if webhook_id:
-        print(f"🔗 Webhook setup complete: {webhook_id}")
+        logger.info("🔗 Webhook setup complete: %s", webhook_id)
     
-    print("\n🎉 WHOP Integration setup complete!")
+    logger.info("\n🎉 WHOP Integration setup complete!")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+WHOP API Integration (async) - Concurrent product creation over aiohttp
+Part of Nosyt WHOP Automation System
+"""
+
+import aiohttp
+import asyncio
+import logging
+import orjson
+from typing import Dict, Any, Optional
+
+# Shares the queued "whop" logger configured in whop_integration
+logger = logging.getLogger("whop")
+
+class AsyncWhopIntegration:
+    """
+    aiohttp counterpart of WhopIntegration's upload path, so a batch can keep
+    several product creations in flight on one event loop
+    """
+    
+    def __init__(self, whop, limit_per_host: int = 16):
+        # Credentials, payload mapping and logging are shared with the blocking client
+        self.whop = whop
+        self.limit_per_host = limit_per_host
+        self.session: Optional[aiohttp.ClientSession] = None
+    
+    async def __aenter__(self) -> 'AsyncWhopIntegration':
+        self.session = aiohttp.ClientSession(
+            headers=self.whop.headers,
+            connector=aiohttp.TCPConnector(limit_per_host=self.limit_per_host),
+            timeout=aiohttp.ClientTimeout(total=60)
+        )
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+    
+    async def aclose(self):
+        """
+        Close the connection pool
+        """
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+    
+    async def warm_up(self):
+        """
+        Open a pooled connection ahead of a batch so the first upload skips the TLS handshake
+        """
+        try:
+            async with self.session.head(
+                f"{self.whop.base_url}/companies/{self.whop.company_id}",
+                timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+                self.whop.rate_limit.update(response.headers)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            pass  # Only an optimization; uploads connect on their own
+    
+    async def create_product(self, product_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Create a new product on WHOP marketplace
+        """
+        key = self.whop._upload_key(product_data)
+        uploaded = self.whop._uploaded_product(key, product_data)
+        if uploaded:
+            return uploaded
+        
+        logger.info("📦 Creating product: %s", product_data.get('title', 'Untitled'))
+        
+        whop_product = self.whop._format_for_whop_api(product_data)
+        
+        try:
+            body, headers = self.whop._json_body(whop_product)
+            await self.whop.rate_limit.wait_async()
+            async with self.session.post(
+                f"{self.whop.base_url}/companies/{self.whop.company_id}/products",
+                data=body,
+                headers=headers
+            ) as response:
+                self.whop.rate_limit.update(response.headers)
+                
+                if response.status == 201:
+                    result = orjson.loads(await response.read())
+                    logger.info("✅ Product created successfully! ID: %s", result.get('id'))
+                    self.whop.cache.invalidate('products')
+                    self.whop._remember_upload(key, result.get('id'))
+                    self.whop._index_created(whop_product, result)
+                    
+                    self.whop._log_action('create_product', 'success', {
+                        'product_id': result.get('id'),
+                        'title': product_data.get('title'),
+                        'price': whop_product.get('price')
+                    })
+                    
+                    return result
+                else:
+                    error_msg = f"Failed to create product. Status: {response.status}, Response: {await response.text()}"
+                    logger.error("❌ %s", error_msg)
+                    
+                    self.whop._log_action('create_product', 'error', {
+                        'title': product_data.get('title'),
+                        'error': error_msg
+                    })
+                    
+                    return None
+        
+        except (aiohttp.ClientError, asyncio.TimeoutError, orjson.JSONDecodeError) as e:
+            error_msg = f"Exception creating product: {str(e)}"
+            logger.error("❌ %s", error_msg)
+            self.whop._log_action('create_product', 'error', {'error': error_msg})
+            return None